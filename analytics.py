@@ -0,0 +1,260 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: analytics.py
+#  Created: 10/19/2026, 09:12
+#   Author: Bernie Roesler
+#
+"""
+  Description: Streaming bankroll analytics for simulated rounds. Every
+  statistic is updated online in constant memory, so results of any number of
+  rounds can be pushed through without keeping a history.
+"""
+#==============================================================================
+import math
+import pprint
+
+#------------------------------------------------------------------------------
+#       Running mean and variance
+#------------------------------------------------------------------------------
+class RunningStats:
+    """ Mean and variance of a stream of values (Welford's algorithm). """
+
+    def __init__(self):
+        self.n    = 0
+        self.mean = 0.0
+        self.m2   = 0.0   # sum of squared deviations from the mean
+
+    def push(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    # Combine with the stats of another stream (Chan et al.)
+    def merge(self, other):
+        n = self.n + other.n
+        if n == 0:
+            return self
+        d = other.mean - self.mean
+        self.m2 += other.m2 + d*d * self.n * other.n / n
+        self.mean += d * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def var(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.var)
+
+    # Standard error of the mean
+    @property
+    def stderr(self):
+        return math.sqrt(self.var / self.n) if self.n > 1 else math.inf
+
+    def __str__(self):
+        return pprint.pformat(self.__dict__)
+
+    def __repr__(self):
+        return self.__str__()
+
+#------------------------------------------------------------------------------
+#       Streaming quantile
+#------------------------------------------------------------------------------
+class P2Quantile:
+    """ Estimate of the p-quantile of a stream, using the P^2 algorithm of
+    Jain & Chlamtac (1985), which keeps only five markers.
+    Keyword inputs:
+        p -- quantile to estimate, 0 < p < 1
+    """
+
+    def __init__(self, p=0.5):
+        self.p    = p
+        self.q    = []                             # marker heights
+        self.n    = [0, 1, 2, 3, 4]                # marker positions
+        self.npos = [0, 2*p, 4*p, 2 + 2*p, 4]      # desired positions
+        self.dn   = [0, p/2, p, (1 + p)/2, 1]      # increments
+
+    def push(self, x):
+        q = self.q
+        # Fill the first five markers directly
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Find cell k containing x, and extend the extremes
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k+1]:
+                k += 1
+
+        n = self.n
+        for i in range(k+1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.npos[i] += self.dn[i]
+
+        # Adjust the middle markers if they are off their desired position
+        for i in range(1, 4):
+            d = self.npos[i] - n[i]
+            if (d >= 1 and n[i+1] - n[i] > 1) or (d <= -1 and n[i-1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self.__parabolic(i, d)
+                if not (q[i-1] < qp < q[i+1]):
+                    qp = q[i] + d * (q[i+d] - q[i]) / (n[i+d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def __parabolic(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d / (n[i+1] - n[i-1]) \
+            * ((n[i] - n[i-1] + d) * (q[i+1] - q[i]) / (n[i+1] - n[i])
+               + (n[i+1] - n[i] - d) * (q[i] - q[i-1]) / (n[i] - n[i-1]))
+
+    @property
+    def value(self):
+        if not self.q:
+            return math.nan
+        if len(self.q) < 5:
+            # Too few samples for markers; use the nearest order statistic
+            return self.q[min(int(self.p * len(self.q)), len(self.q)-1)]
+        return self.q[2]
+
+    def __str__(self):
+        return pprint.pformat(self.__dict__)
+
+    def __repr__(self):
+        return self.__str__()
+
+#------------------------------------------------------------------------------
+#       Bankroll statistics of one seat (or policy)
+#------------------------------------------------------------------------------
+class BankrollStats:
+    """ Round results and bankroll path of one seat.
+    Keyword inputs:
+        quantiles -- which quantiles of the drawdown distribution to track
+    Contains:
+        result   -- RunningStats of the net result of each round
+        peak     -- highest bankroll seen
+        drawdown -- current drawdown from the peak
+        maxDrawdown -- largest drawdown seen
+        ddq      -- P2Quantile of drawdown for each of quantiles
+    """
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, quantiles=QUANTILES):
+        self.result      = RunningStats()
+        self.bankroll    = None
+        self.peak        = -math.inf
+        self.drawdown    = 0.0
+        self.maxDrawdown = 0.0
+        self.ddq         = { p : P2Quantile(p) for p in quantiles }
+
+    def push(self, net, bankroll=None):
+        self.result.push(net)
+        if bankroll is None:
+            return
+        self.bankroll = bankroll
+        self.peak = max(self.peak, bankroll)
+        self.drawdown = self.peak - bankroll
+        self.maxDrawdown = max(self.maxDrawdown, self.drawdown)
+        for q in self.ddq.values():
+            q.push(self.drawdown)
+
+    # Mean and variance of the result per round
+    @property
+    def mean(self):
+        return self.result.mean
+
+    @property
+    def var(self):
+        return self.result.var
+
+    # Number of rounds needed for the expectation to equal one standard
+    # deviation of the results, i.e. N0 = var / mean^2
+    @property
+    def n0(self):
+        if self.mean == 0:
+            return math.inf
+        return self.var / self.mean**2
+
+    def riskOfRuin(self, bankroll=None):
+        """ Probability of losing the entire bankroll, using the diffusion
+        approximation exp(-2 mean B / var). Defaults to the current bankroll.
+        """
+        B = self.bankroll if bankroll is None else bankroll
+        if B is None or B <= 0:
+            return 1.0
+        if self.mean <= 0:
+            return 1.0
+        if self.var == 0:
+            return 0.0
+        return math.exp(-2 * self.mean * B / self.var)
+
+    def summary(self):
+        return { 'rounds'      : self.result.n,
+                 'mean'        : self.mean,
+                 'var'         : self.var,
+                 'n0'          : self.n0,
+                 'riskOfRuin'  : self.riskOfRuin(),
+                 'maxDrawdown' : self.maxDrawdown,
+                 'drawdown'    : { p : q.value for p, q in self.ddq.items() },
+               }
+
+    def __str__(self):
+        return pprint.pformat(self.summary())
+
+    def __repr__(self):
+        return self.__str__()
+
+#------------------------------------------------------------------------------
+#       Analytics over a whole table
+#------------------------------------------------------------------------------
+class Analytics:
+    """ Bankroll statistics per seat and per policy, fed by round results.
+    Contains:
+        bySeat   -- dict of (seat, policy) -> BankrollStats
+        byPolicy -- dict of policy -> BankrollStats (results only, since
+                    bankrolls of different seats don't add up to one path)
+    """
+
+    def __init__(self):
+        self.bySeat   = {}
+        self.byPolicy = {}
+
+    def push(self, seat, net, bankroll=None, policy=None):
+        key = (seat, policy)
+        if key not in self.bySeat:
+            self.bySeat[key] = BankrollStats()
+        if policy not in self.byPolicy:
+            self.byPolicy[policy] = BankrollStats()
+        self.bySeat[key].push(net, bankroll)
+        self.byPolicy[policy].push(net)
+
+    # Consume the results of one round, as given by Blackjack.roundResults
+    def record(self, results, policy=None):
+        for seat, net, bankroll in results:
+            self.push(seat, net, bankroll, policy)
+
+    def summary(self):
+        return { 'bySeat'   : { k : v.summary() for k, v in self.bySeat.items() },
+                 'byPolicy' : { k : v.summary() for k, v in self.byPolicy.items() },
+               }
+
+    def __str__(self):
+        return pprint.pformat(self.summary())
+
+    def __repr__(self):
+        return self.__str__()
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,196 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: baccarat.py
+#  Created: 10/19/2026, 16:55
+#   Author: Bernie Roesler
+#
+"""
+  Description: Punto banco baccarat, on the table game core of casinogame.
+  Each seat bets on the Player hand, the Banker hand, or a tie. The dealer
+  deals both hands by fixed rules, so the only decision is the bet.
+"""
+#==============================================================================
+from casinogame import TableGame, registerGame
+
+#------------------------------------------------------------------------------
+#       Baccarat game class
+#------------------------------------------------------------------------------
+@registerGame
+class Baccarat(TableGame):
+    """ The logic of punto banco baccarat.
+    The dealer holds two hands: the Player hand (dealer.player.hand[0]) and
+    the Banker hand (dealer.player.hand[1]).
+    """
+    TITLE = "baccarat"
+
+    PENETRATION = 0.9   # fraction of the shoe dealt before reshuffling
+
+    # Bets, and what a winning bet pays per unit staked
+    PLAYER = "p"
+    BANKER = "b"
+    TIE    = "t"
+    PAYS = { PLAYER : 1.0,
+             BANKER : 0.95,   # 5% commission
+             TIE    : 8.0,
+           }
+    BET_STR = { PLAYER : "Player",
+                BANKER : "Banker",
+                TIE    : "Tie",
+              }
+
+    def __init__(self, nd=8, rng=None):
+        super().__init__(nd, rng)
+        self.sides = []   # side bet by each seat in this round
+
+    #--------------------------------------------------------------------------
+    #        Main Gameplay
+    #--------------------------------------------------------------------------
+    def gameRound(self):
+        self.clearTable()
+        self.checkShoe(Baccarat.PENETRATION)
+
+        ### Place bets, and choose what to bet on
+        self.placeBets()
+        self.sides = [None] * self.table.n_seats
+        self.aroundQueue(self.chooseSide)
+
+        ### Deal the two hands, and draw third cards by the rules
+        self.say("...Dealing the coup...")
+        player = self.dealer.player.openHand()
+        banker = self.dealer.player.openHand()
+        for i in range(2):
+            self.draw(player, "Player")
+            self.draw(banker, "Banker")
+        self.drawThirdCards(player, banker)
+
+        ### Settle bets
+        if player.score > banker.score:
+            win = Baccarat.PLAYER
+        elif banker.score > player.score:
+            win = Baccarat.BANKER
+        else:
+            win = Baccarat.TIE
+        self.say("Player {} -- Banker {}: {} wins!".format(
+                 player.score, banker.score, Baccarat.BET_STR[win]))
+        self.say("...Settling bets...")
+        stakes = []
+        for i, seat in enumerate(self.table.seat):
+            if not seat.isEmpty and seat.player.n_hands:
+                stakes.append(self.settleSide(seat, self.sides[i], win))
+        self.settleStakes(stakes)
+
+    # Deal one card face up to one of the dealer's hands
+    def draw(self, h, label):
+        c = self.deck.dealCard(faceup=True)
+        h.addCard(c)
+        h.score = Baccarat.score(h)
+        self.say("{} hand received {}".format(label, c))
+        return c
+
+    # Third-card rules: the Player hand draws on 0-5. The Banker hand then
+    # draws on 0-5 if the Player stood, and otherwise by its score and the
+    # Player's third card. A natural (8 or 9) on either hand stops both.
+    def drawThirdCards(self, player, banker):
+        if player.score >= 8 or banker.score >= 8:
+            self.say("A natural!")
+            return
+        third = None
+        if player.score <= 5:
+            third = Baccarat.value(self.draw(player, "Player"))
+        if third is None:
+            draws = banker.score <= 5
+        else:
+            draws = Baccarat.bankerDraws(banker.score, third)
+        if draws:
+            self.draw(banker, "Banker")
+
+    @staticmethod
+    def bankerDraws(b, third):
+        if b <= 2:
+            return True
+        elif b == 3:
+            return third != 8
+        elif b == 4:
+            return 2 <= third <= 7
+        elif b == 5:
+            return 4 <= third <= 7
+        elif b == 6:
+            return third in (6, 7)
+        return False
+
+    # Baccarat value of a card: tens and face cards count 0
+    @staticmethod
+    def value(card):
+        return card.val if card.val < 10 else 0
+
+    @staticmethod
+    def score(h):
+        return sum(Baccarat.value(c) for c in h.cards) % 10
+
+    #--------------------------------------------------------------------------
+    #        Individual Player Methods
+    #--------------------------------------------------------------------------
+    # Choose the bet of the seat, for its first hand
+    def chooseSide(self, seat):
+        if not seat.isEmpty and seat.player.n_hands:
+            i = self.table.seat.index(seat)
+            self.sides[i] = self.decide(self.__choose, seat,
+                                        seat.player.getFirstHand(),
+                                        default=self.__timeoutChoice)
+            self.say("{} bets on {}.".format(seat.player.name,
+                                            Baccarat.BET_STR[self.sides[i]]))
+
+    # Stake of a seat on side, to settle when win won the coup (see
+    # settleStakes). Bets on the Player or Banker push on a tie.
+    def settleSide(self, seat, side, win):
+        h = seat.player.getFirstHand()
+        if side == win:
+            b = 1
+            self.say("{} won ${}!".format(seat.player.name,
+                                          Baccarat.PAYS[side]*h.bet))
+        elif win == Baccarat.TIE:
+            b = 0
+            self.say("{} pushed.".format(seat.player.name))
+        else:
+            b = -1
+            self.say("{} lost ${} :(".format(seat.player.name, h.bet))
+        return self.handStake(seat, h, b, Baccarat.PAYS[side])
+
+    # Choice of a player who ran out of time
+    def __timeoutChoice(self, seat, h):
+        return Baccarat.BANKER
+
+    # Choice of a player: computer players follow their policy, else bet on
+    # the Banker, which has the lowest house edge
+    def __choose(self, seat, h):
+        if seat.player.policy is not None:
+            return seat.player.policy(self, seat, h)
+        elif __debug__ or not seat.player.isUser:
+            return Baccarat.BANKER
+        else:
+            return self.__getChoice(seat, h)
+
+    #--------------------------------------------------------------------------
+    #        Interface
+    #--------------------------------------------------------------------------
+    def __getChoice(self, seat, h):
+        print("########## It's your turn! ##########")
+        print("### Your bet is: ${}".format(h.bet))
+        self.__betMenu()
+        while True:
+            c = self.ask(self._PROMPT)
+            if c in Baccarat.PAYS:
+                return c
+            if c != "?":
+                print("Invalid input.")
+            self.__betMenu()
+
+    def __betMenu(self):
+        print("---------- Bet on ----------\n"
+              "  ? -- print this menu\n"
+              "  p -- the Player hand (pays 1:1)\n"
+              "  b -- the Banker hand (pays 1:1, less 5% commission)\n"
+              "  t -- a tie (pays 8:1)")
+
+#==============================================================================
+#==============================================================================
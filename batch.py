@@ -0,0 +1,266 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: batch.py
+#  Created: 10/19/2026, 18:40
+#   Author: Bernie Roesler
+#
+"""
+  Description: Run headless simulations of casino tables from a config file,
+  and stream their progress and results as JSON lines.
+
+  The config (TOML, or JSON for a .json file) has top-level defaults, and a
+  list of tables, each of which may override any default:
+
+    seed    = 1          # seed of the first table; table k uses seed + k
+    workers = 4          # worker processes (0 runs every table in-process)
+    rounds  = 100000     # stopping rules, as for simulate.Simulation.run:
+                         # rounds, halfwidth, wallTime, cpuTime
+    batch   = 1000       # rounds between progress lines
+
+    [[table]]
+    name    = "basic"
+    game    = "blackjack"   # class name of a registered game
+    seats   = 5
+    minbet  = 10
+    money   = 1e12
+    policy  = "basic"       # see strategy.POLICIES
+    betting = { sizer = "spread", maxUnits = 8 }   # see betting.SIZERS
+    deadline = 0.5          # [s] per decision, else the default action
+    decks   = 6             # decks in the shoe (default of the game)
+    rules   = { hitSoft17 = true }   # blackjack only, see rules.RuleSet
+
+  Usage: python casino.py simulate --config run.toml
+"""
+#==============================================================================
+import json
+import math
+import multiprocessing
+import queue
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import betting
+import casinogame
+import strategy
+from rules import RuleSet
+from simulate import Simulation
+
+# Importing the game plugins registers them with casinogame.GAMES
+import baccarat
+import holdem
+
+# Defaults of every table
+DEFAULTS = { 'game'    : "blackjack",
+             'seats'   : None,   # default of the game
+             'minbet'  : None,
+             'money'   : 1e12,
+             'policy'  : None,
+             'betting' : None,
+             'rules'   : None,
+             'decks'   : None,
+             'deadline' : None,
+             'seed'    : 0,
+             'workers' : 0,
+             'batch'   : Simulation.DEFAULT_BATCH,
+             'rounds'  : None,
+             'halfwidth' : None,
+             'wallTime'  : None,
+             'cpuTime'   : None,
+           }
+
+#------------------------------------------------------------------------------
+#       Configuration
+#------------------------------------------------------------------------------
+def loadConfig(path):
+    """ Read a config file, TOML unless its name ends in .json. """
+    if path.endswith(".json"):
+        with open(path) as fp:
+            return json.load(fp)
+    import tomllib
+    with open(path, "rb") as fp:
+        return tomllib.load(fp)
+
+def tableSpecs(config):
+    """ Full settings of every table of a config, with the defaults and the
+    top-level settings filled in.
+    """
+    top = { k : v for k, v in config.items() if k != 'table' }
+    unknown = set(top) - set(DEFAULTS)
+    tables = config.get('table', [{}])
+    for t in tables:
+        unknown |= set(t) - set(DEFAULTS) - {'name'}
+    if unknown:
+        raise RuntimeError("Unknown config keys: {}".format(sorted(unknown)))
+
+    specs = []
+    for k, t in enumerate(tables):
+        spec = dict(DEFAULTS)
+        spec.update(top)
+        spec.update(t)
+        spec['seed'] = t.get('seed', top.get('seed', DEFAULTS['seed']) + k)
+        spec.setdefault('name', "table{}".format(k))
+        checkSpec(spec)
+        specs.append(spec)
+    return specs
+
+def checkSpec(spec):
+    """ Check the settings of a table against its game, so that a bad
+    config fails before any table starts rather than inside a worker.
+    """
+    def fail(msg):
+        raise RuntimeError("Table {}: {}".format(spec['name'], msg))
+
+    cls = gameClass(spec['game'])
+    # Rule sets and playing policies (see strategy.py) are for blackjack
+    if not issubclass(cls, casinogame.Blackjack):
+        for k in ('rules', 'policy'):
+            if spec[k] is not None:
+                fail("{} doesn't apply to {}".format(k, cls.__name__))
+    if spec['policy'] is not None and spec['policy'] not in strategy.POLICIES:
+        fail("unknown policy {} (one of {})".format(
+             spec['policy'], sorted(strategy.POLICIES)))
+    if spec['rules'] is not None:
+        if spec['decks'] is not None and 'nDecks' in spec['rules'] \
+                and spec['rules']['nDecks'] != spec['decks']:
+            fail("decks and rules.nDecks disagree")
+        try:
+            RuleSet(**spec['rules'])
+        except TypeError as e:
+            fail("bad rules: {}".format(e))
+    if spec['betting'] is not None:
+        args = dict(spec['betting'])
+        name = args.pop('sizer', None)
+        if name not in betting.SIZERS:
+            fail("unknown sizer {} (one of {})".format(
+                 name, sorted(betting.SIZERS)))
+        try:
+            betting.SIZERS[name](**args)
+        except TypeError as e:
+            fail("bad betting: {}".format(e))
+
+# Game classes by lower-case class name, e.g. "blackjack"
+def gameClass(name):
+    games = { g.__name__.lower() : g for g in casinogame.GAMES.values() }
+    if name.lower() not in games:
+        raise RuntimeError("Unknown game: {} (one of {})"
+                           .format(name, sorted(games)))
+    return games[name.lower()]
+
+def makeGame(spec):
+    """ Game of a table spec, with its table of computer players set up. """
+    kw = { 'rng' : random.Random(spec['seed']) }
+    if spec['rules'] is not None:
+        # A rule set has its own deck count, which decks fills in
+        rules = dict(spec['rules'])
+        if spec['decks'] is not None:
+            rules['nDecks'] = spec['decks']
+        kw['rules'] = RuleSet(**rules)
+    elif spec['decks'] is not None:
+        kw['nd'] = spec['decks']
+    g = gameClass(spec['game'])(**kw)
+
+    policy = spec['policy']
+    if policy is not None:
+        policy = strategy.POLICIES[policy]
+    sizer = spec['betting']
+    if sizer is not None:
+        args = dict(sizer)
+        sizer = betting.SIZERS[args.pop('sizer')](**args)
+    g.botInit(spec['seats'], spec['minbet'], spec['money'], policy=policy,
+              betting=sizer)
+    g.deadline = spec['deadline']
+    return g
+
+#------------------------------------------------------------------------------
+#       Running tables
+#------------------------------------------------------------------------------
+def runTable(spec, emit):
+    """ Simulate one table, calling emit(record) with every progress record,
+    and return its result record.
+    """
+    sim = Simulation(makeGame(spec), batch=spec['batch'])
+    stops = { k : spec[k] for k in ('halfwidth', 'wallTime', 'cpuTime') }
+    stops['maxRounds'] = spec['rounds']
+    if all(v is None for v in stops.values()):
+        stops['maxRounds'] = 10 * Simulation.DEFAULT_BATCH
+    res = sim.run(progress=lambda s: emit(record('progress', spec, s)),
+                  **stops)
+    return record('result', spec, res)
+
+# Worker side of a process pool: progress goes back over a queue
+def _runQueued(spec, q):
+    return runTable(spec, q.put)
+
+def record(event, spec, summary=None):
+    rec = { 'event' : event, 'table' : spec['name'], 'time' : time.time() }
+    if summary is not None:
+        rec.update(summary)
+    return rec
+
+def _clean(x):
+    if isinstance(x, float) and not math.isfinite(x):
+        return None
+    if isinstance(x, dict):
+        return { k : _clean(v) for k, v in x.items() }
+    return x
+
+class JsonLines:
+    """ Writes records to a stream, one JSON object per line. """
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+
+    def __call__(self, rec):
+        self.out.write(json.dumps(_clean(rec), default=float) + "\n")
+        self.out.flush()
+
+def run(config, out=sys.stdout):
+    """ Simulate every table of a config, writing JSON lines to out: a
+    'start' and a 'result' record per table, 'progress' records while they
+    run, and a final 'done' record. Returns the list of result records.
+    """
+    emit = JsonLines(out)
+    specs = tableSpecs(config)
+    workers = max(spec['workers'] for spec in specs) if specs else 0
+    for spec in specs:
+        emit(record('start', spec, { 'config' : spec }))
+
+    results = []
+    if workers <= 0:
+        for spec in specs:
+            results.append(runTable(spec, emit))
+            emit(results[-1])
+    else:
+        with multiprocessing.Manager() as mgr:
+            q = mgr.Queue()
+            with ProcessPoolExecutor(workers) as pool:
+                pending = { pool.submit(_runQueued, spec, q) for spec in specs }
+                while pending:
+                    done, pending = wait(pending, timeout=0.2,
+                                         return_when=FIRST_COMPLETED)
+                    _drain(q, emit)
+                    for f in done:
+                        results.append(f.result())
+                        emit(results[-1])
+            _drain(q, emit)
+
+    emit({ 'event' : 'done', 'tables' : len(results), 'time' : time.time() })
+    return results
+
+def _drain(q, emit):
+    while True:
+        try:
+            emit(q.get_nowait())
+        except queue.Empty:
+            return
+
+#------------------------------------------------------------------------------
+#       Main function
+#------------------------------------------------------------------------------
+if __name__ == "__main__":
+    run(loadConfig(sys.argv[1]))
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,134 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: betting.py
+#  Created: 10/19/2026, 18:05
+#   Author: Bernie Roesler
+#
+"""
+  Description: Bet sizing for the seats of a table. A bet sizer is called as
+  sizer(game, rows), where rows is an array of the rows of the seated players
+  in the table's PlayerStore, and returns an array of their bets. Sizers work
+  on whole arrays, so one call sizes the bets of every seat.
+"""
+#==============================================================================
+import numpy as np
+
+#------------------------------------------------------------------------------
+#       Shoe state
+#------------------------------------------------------------------------------
+def runningCount(index):
+    """ Hi-Lo running count of the cards dealt since the last reshuffle, from
+    the ShoeIndex of the cards left: 2-6 count +1, 10-A count -1. The tags of
+    a full shoe sum to 0, so the count of the cards dealt is minus the count
+    of the cards left.
+    """
+    low  = index.countAtMost(6) - index.countAtMost(1)
+    high = index.total - index.countAtMost(9) + index.rankCount(1)
+    return high - low
+
+def trueCount(index):
+    """ Running count per deck left in the shoe. """
+    decks = index.total / 52
+    if decks <= 0:
+        return 0.0
+    return runningCount(index) / decks
+
+#------------------------------------------------------------------------------
+#       Bet sizers
+#------------------------------------------------------------------------------
+class Flat:
+    """ Bet the same number of table minimums every round.
+    Keyword inputs:
+        units -- bet in units of the table minimum
+    """
+
+    def __init__(self, units=1):
+        self.units = units
+
+    def __call__(self, game, rows):
+        return np.full(len(rows), self.units * game.table.minbet)
+
+class CountSpread:
+    """ Spread bets with the Hi-Lo true count of the shoe.
+    Keyword inputs:
+        ramp     -- units bet per point of true count above pivot
+        pivot    -- true count at (or below) which to bet one unit
+        maxUnits -- largest bet, in units of the table minimum
+    """
+
+    def __init__(self, ramp=1.0, pivot=1.0, maxUnits=8):
+        self.ramp     = ramp
+        self.pivot    = pivot
+        self.maxUnits = maxUnits
+
+    def units(self, game):
+        tc = trueCount(game.deck.index)
+        return min(max(1.0 + self.ramp*(tc - self.pivot), 1.0), self.maxUnits)
+
+    def __call__(self, game, rows):
+        return np.full(len(rows), np.floor(self.units(game)) * game.table.minbet)
+
+class Kelly:
+    """ Bet a fraction of the Kelly bet on each player's bankroll.
+    Keyword inputs:
+        fraction -- fraction of the full Kelly bet (0.5 is half Kelly)
+        edge     -- player edge off the top of the shoe
+        perCount -- player edge gained per point of Hi-Lo true count
+        variance -- variance of the result of one hand, per unit squared
+    The Kelly bet is edge / variance of the bankroll. With no edge, bet the
+    table minimum.
+    """
+
+    def __init__(self, fraction=0.5, edge=-0.005, perCount=0.005,
+                 variance=1.3):
+        self.fraction = fraction
+        self.edge     = edge
+        self.perCount = perCount
+        self.variance = variance
+
+    def __call__(self, game, rows):
+        edge = self.edge + self.perCount * trueCount(game.deck.index)
+        k = max(edge, 0.0) / self.variance * self.fraction
+        return np.floor(k * game.table.store.money[rows])
+
+class Martingale:
+    """ Double the bet after every loss, and go back to one unit after a win
+    or push. For comparison only: it doesn't change the edge.
+    Keyword inputs:
+        units    -- first bet, in units of the table minimum
+        maxUnits -- largest bet, in units of the table minimum
+    """
+
+    def __init__(self, units=1, maxUnits=1024):
+        self.units    = units
+        self.maxUnits = maxUnits
+        self.bet      = np.zeros(0)   # last bet of each row, in units
+        self.before   = np.zeros(0)   # bankroll of each row before that bet
+
+    def __grow(self, n):
+        if n > len(self.bet):
+            self.bet    = np.concatenate([ self.bet, np.zeros(n - len(self.bet)) ])
+            self.before = np.concatenate([ self.before,
+                                           np.full(n - len(self.before), np.nan) ])
+
+    def __call__(self, game, rows):
+        store = game.table.store
+        self.__grow(store.size)
+        money = store.money[rows]
+        # A row with no bet yet has no result (nan), and starts at one unit
+        lost = (money - self.before[rows]) < 0
+        units = np.where(lost, np.minimum(2*self.bet[rows], self.maxUnits),
+                         self.units)
+        self.bet[rows] = units
+        self.before[rows] = money
+        return units * game.table.minbet
+
+# Sizers by name, i.e. for configuration files
+SIZERS = { 'flat'       : Flat,
+           'spread'     : CountSpread,
+           'kelly'      : Kelly,
+           'martingale' : Martingale,
+         }
+
+#==============================================================================
+#==============================================================================
@@ -8,8 +8,12 @@
   Description: Implement a deck of cards
 """
 #==============================================================================
+import array
 import random
 import pprint
+import sys
+
+import numpy as np
 
 #------------------------------------------------------------------------------
 #       Table for playing card games
@@ -29,6 +33,7 @@ class Table:
         self.minbet  = m
         self.seat    = [ Seat() for i in range(n) ]
         self.cards   = []
+        self.store   = PlayerStore(n)   # state of the players at the table
 
     def seatPlayer(self, player, n):
         if n < self.n_seats:
@@ -51,9 +56,8 @@ class Table:
     #        Pretty-printing
     #--------------------------------------------------------------------------
     def tableStatus(self):
-        for i, s in enumerate(self.seat):
-            print("---------- Seat: ", i)
-            print(str(s.player))
+        print("\n".join("---------- Seat:  {}\n{}".format(i, s.player)
+                        for i, s in enumerate(self.seat)))
 
     def __str__(self):
         return pprint.pformat(self.__dict__)
@@ -69,6 +73,7 @@ class Seat:
     Keyword inputs:
         player -- a Player object to sit at the seat
     """
+    __slots__ = ('player', 'isEmpty')
 
     def __init__(self, player=None):
         self.player = player
@@ -88,6 +93,64 @@ class Seat:
     def __repr__(self):
         return self.__str__()
 
+#------------------------------------------------------------------------------
+#       Struct-of-arrays storage for many players
+#------------------------------------------------------------------------------
+class PlayerStore:
+    """ Numeric state of a population of players, one array per field.
+    Keyword inputs:
+        n -- initial capacity (grows as players are added)
+    Contains:
+        money   -- [float] wallet of each player
+        bet     -- [float] outstanding bet of each player
+        n_hands -- [int] number of hands each player holds
+        flags   -- [uint8] bit flags (IS_USER) of each player
+        size    -- number of players allocated
+    Player objects are views onto one row of the store, so bankrolls of every
+    player at a table can be updated in a single vectorized operation.
+    """
+    IS_USER = 1
+
+    def __init__(self, n=1):
+        n = max(int(n), 1)
+        self.money   = np.zeros(n, dtype=np.float64)
+        self.bet     = np.zeros(n, dtype=np.float64)
+        self.n_hands = np.zeros(n, dtype=np.int32)
+        self.flags   = np.zeros(n, dtype=np.uint8)
+        self.size    = 0
+
+    # Allocate a row for a new player, and return its index
+    def alloc(self, m=0.0, isUser=False):
+        if self.size == len(self.money):
+            self.__grow(2*self.size)
+        i = self.size
+        self.money[i] = m
+        self.bet[i] = 0.0
+        self.n_hands[i] = 0
+        self.flags[i] = PlayerStore.IS_USER if isUser else 0
+        self.size += 1
+        return i
+
+    def __grow(self, n):
+        def resize(a):
+            b = np.zeros(n, dtype=a.dtype)
+            b[:len(a)] = a
+            return b
+        self.money   = resize(self.money)
+        self.bet     = resize(self.bet)
+        self.n_hands = resize(self.n_hands)
+        self.flags   = resize(self.flags)
+
+    # Vectorized bankroll update: add amount[k] to the wallet of player idx[k]
+    def credit(self, idx, amount):
+        np.add.at(self.money, idx, amount)
+
+    def __str__(self):
+        return pprint.pformat(self.__dict__)
+
+    def __repr__(self):
+        return self.__str__()
+
 #------------------------------------------------------------------------------
 #       Generic card player
 #------------------------------------------------------------------------------
@@ -97,15 +160,61 @@ class Player:
         name   -- [string] name of player
         m      -- [float] initial wallet amount
         isUser -- [boolean] whether player is user-interactive
+        store  -- [PlayerStore] where to keep the player's numeric state
+                  (i.e. the table's store). Defaults to a private store.
+        policy -- procedure choosing the computer player's moves, called by
+                  the game as policy(game, seat, hand)
     """
+    __slots__ = ('name', 'hand', 'policy', '_store', '_i')
 
-    def __init__(self, name="Player", m=100.0, isUser=False):
+    def __init__(self, name="Player", m=100.0, isUser=False, store=None,
+                 policy=None):
         self.name = name
         self.hand = []
-        self.n_hands = 0
-        self.money = m
-        self.bet = 0.0
-        self.isUser = isUser
+        self.policy = policy
+        self._store = store if store is not None else PlayerStore()
+        self._i = self._store.alloc(m, isUser)
+
+    # Numeric state lives in the store
+    @property
+    def money(self):
+        return self._store.money[self._i]
+
+    @money.setter
+    def money(self, m):
+        self._store.money[self._i] = m
+
+    @property
+    def bet(self):
+        return self._store.bet[self._i]
+
+    @bet.setter
+    def bet(self, b):
+        self._store.bet[self._i] = b
+
+    @property
+    def n_hands(self):
+        return int(self._store.n_hands[self._i])
+
+    @n_hands.setter
+    def n_hands(self, n):
+        self._store.n_hands[self._i] = n
+
+    @property
+    def isUser(self):
+        return bool(self._store.flags[self._i] & PlayerStore.IS_USER)
+
+    @isUser.setter
+    def isUser(self, b):
+        if b:
+            self._store.flags[self._i] |= PlayerStore.IS_USER
+        else:
+            self._store.flags[self._i] &= ~PlayerStore.IS_USER & 0xff
+
+    # Row of the player in its store, i.e. to index arrays of the whole table
+    @property
+    def row(self):
+        return self._i
 
     # Accessing
     def getFirstHand(self):
@@ -124,13 +233,29 @@ class Player:
         self.hand.append(h)
         self.n_hands += 1
 
+    # Split hand h, and append the new hand after all others so that any loop
+    # walking self.hand by index picks it up in turn
+    def splitHand(self, h):
+        new = h.split(Player.POOL)
+        self.addHand(new)
+        return new
+
+    # Open a new (empty) hand, taken from the pool of hands
+    def openHand(self, bet=0.0):
+        h = Player.POOL.acquire(bet)
+        self.addHand(h)
+        return h
+
+    # Return all hands to the pool, emptying the list of hands in place
     def discardAllHands(self):
-        self.hand = []
+        for h in self.hand:
+            Player.POOL.release(h)
+        del self.hand[:]
         self.n_hands = 0
 
     def receiveCard(self, card, h=0):
         if h >= self.n_hands:
-            self.addHand(Hand(card))
+            self.openHand().addCard(card)
         else:
             self.hand[h].addCard(card)
 
@@ -160,8 +285,7 @@ class Player:
 
     # Show face-up cards only
     def showAllFaceup(self):
-        lst = list(map(lambda x: str(Hand(x.faceUpCards())), self.hand))
-        return '\n'.join(lst)
+        return '\n'.join(h.faceUpStr() for h in self.hand)
 
     def __str__(self):
         if self.isUser:
@@ -178,47 +302,182 @@ class Player:
                     .format(self.name, markUser, this_hand, self.money, self.bet)
 
     def __repr__(self):
+        return pprint.pformat({'name'    : self.name,
+                               'hand'    : self.hand,
+                               'n_hands' : self.n_hands,
+                               'money'   : float(self.money),
+                               'bet'     : float(self.bet),
+                               'isUser'  : self.isUser})
+
+#------------------------------------------------------------------------------
+#       Composition index of the cards left in a deck
+#------------------------------------------------------------------------------
+class ShoeIndex:
+    """ Fenwick (binary indexed) tree over the rank x suit counts of a deck.
+    Keyword inputs:
+        n -- number of 52-card decks initially in the index
+    Slots are ordered rank-major, so that a prefix of the tree is the number
+    of cards with value <= some rank. Weighted draws, removals and prefix
+    queries are all O(log 52).
+    """
+    N_SLOTS = 52
+
+    def __init__(self, n=1):
+        self.count = [n] * ShoeIndex.N_SLOTS   # raw count in each slot
+        self.total = n * ShoeIndex.N_SLOTS
+        # Build the tree in O(N) by pushing each node into its parent
+        self.tree = [0] + self.count[:]
+        for i in range(1, ShoeIndex.N_SLOTS+1):
+            j = i + (i & -i)
+            if j <= ShoeIndex.N_SLOTS:
+                self.tree[j] += self.tree[i]
+
+    # Slot of a given card value/suit
+    @staticmethod
+    def slot(val, suit):
+        return 4*(val-1) + suit
+
+    # Change count in slot i by delta
+    def add(self, i, delta):
+        self.count[i] += delta
+        self.total += delta
+        i += 1
+        while i <= ShoeIndex.N_SLOTS:
+            self.tree[i] += delta
+            i += i & -i
+
+    # Number of cards in slots [0, i)
+    def prefix(self, i):
+        s = 0
+        while i > 0:
+            s += self.tree[i]
+            i -= i & -i
+        return s
+
+    # Add and remove cards
+    def addCard(self, card):
+        self.add(ShoeIndex.slot(card.val, card.suit), 1)
+
+    def removeCard(self, card):
+        i = ShoeIndex.slot(card.val, card.suit)
+        if self.count[i] < 1:
+            raise RuntimeError("Card not in index!")
+        self.add(i, -1)
+
+    def cardCount(self, card):
+        return self.count[ShoeIndex.slot(card.val, card.suit)]
+
+    # Composition queries by rank
+    def rankCount(self, val):
+        return self.prefix(4*val) - self.prefix(4*(val-1))
+
+    def countAtMost(self, val):
+        return self.prefix(4*val)
+
+    def probAtMost(self, val):
+        """ P(next card has value <= val), e.g. probAtMost(6). """
+        if self.total == 0:
+            return 0.0
+        return self.countAtMost(val) / self.total
+
+    # Find the slot holding the k-th card (0-indexed) by descending the tree
+    def find(self, k):
+        pos = 0
+        step = 32   # highest power of 2 <= N_SLOTS
+        while step:
+            nxt = pos + step
+            if nxt <= ShoeIndex.N_SLOTS and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    # Weighted draws return (val, suit) of a card, drawn by remaining counts
+    def sample(self, rng=random):
+        if self.total == 0:
+            raise RuntimeError("No cards left in index!")
+        i = self.find(rng.randrange(self.total))
+        return i // 4 + 1, i % 4
+
+    def draw(self, rng=random):
+        val, suit = self.sample(rng)
+        self.add(ShoeIndex.slot(val, suit), -1)
+        return val, suit
+
+    def __str__(self):
         return pprint.pformat(self.__dict__)
 
+    def __repr__(self):
+        return self.__str__()
+
 #------------------------------------------------------------------------------
 #       Deck of n*52 cards
 #------------------------------------------------------------------------------
 # TODO generalize Deck to just a stack of any number of cards
 class Deck:
     # Create list of cards
-    def __init__(self, n=1):
+    def __init__(self, n=1, rng=None):
         self.cards = []
         self.cardsLeft = 0
         self.Ndecks = n
+        self.discards = []   # cards played, waiting for the next reshuffle
+        # Source of shuffles: anything with a shuffle(list) method
+        self.rng = rng if rng is not None else random.Random()
         # Allow multiple decks
         for deck in range(n):
             for suit in range(4):
                 for val in range(1,14):
                     self.cards.append(Card(val, suit))
                     self.cardsLeft += 1
+        # Composition of the cards left, for analytic queries
+        self.index = ShoeIndex(n)
 
     # shuffle cards in place
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
+
+    # Gather the discards back into the deck and shuffle. The deck is put in
+    # a fixed order first, so that two decks with the same rng state deal the
+    # same sequence of cards, whatever happened to them before.
+    def reshuffle(self):
+        for c in self.discards:
+            self.index.addCard(c)
+        self.cards.extend(self.discards)
+        self.cardsLeft += len(self.discards)
+        del self.discards[:]
+        self.cards.sort(key=lambda c: (c.val, c.suit))
+        self.shuffle()
+
+    # Fraction of the deck that has been dealt since the last reshuffle
+    def dealtFraction(self):
+        return 1.0 - self.cardsLeft / (52 * self.Ndecks)
 
     # Deal "top" of deck
     def dealCard(self, faceup=False):
+        if self.cardsLeft == 0 and self.discards:
+            self.reshuffle()
         if self.cardsLeft > 0:
             self.cardsLeft -= 1
             c = self.cards.pop(0)
+            self.index.removeCard(c)
             if faceup:
                 c.turnUp()
             return c
         else:
             print("No cards left!")
 
+    # Put a played card on the discard pile, face down
+    def discardCard(self, card):
+        card.turnDown()
+        self.discards.append(card)
+
     # Return card to bottom of deck
     def returnCard(self, card):
-        # List of cards in deck that match given card
-        ff = list(filter(lambda c: c.equiv(card), self.cards))
-        if len(ff) < self.Ndecks:
+        # Number of cards in deck that match given card
+        if self.index.cardCount(card) < self.Ndecks:
             self.cards.append(card)
             self.cardsLeft += 1
+            self.index.addCard(card)
         else:
             raise RuntimeError("Card already in deck!")
 
@@ -227,34 +486,109 @@ class Deck:
         lst = [str(card) for card in self.cards]
         return "\n".join(lst)
 
+#------------------------------------------------------------------------------
+#       Pre-shuffled shoes
+#------------------------------------------------------------------------------
+class ShoeCache:
+    """ Sequence of shoe orders, generated once from a seed and then replayed.
+    Keyword inputs:
+        nDecks -- number of decks in the shoe
+        seed   -- seed of the sequence
+    Each order is a permutation of the shoe in its sorted order (see
+    Deck.reshuffle), stored as an array of 2-byte indices.
+    """
+
+    def __init__(self, nDecks=6, seed=0):
+        self.nCards = 52 * nDecks
+        self.rng    = random.Random(seed)
+        self.orders = []
+
+    # k-th shoe order, generating any that don't exist yet
+    def order(self, k):
+        while len(self.orders) <= k:
+            perm = list(range(self.nCards))
+            self.rng.shuffle(perm)
+            self.orders.append(array.array('H', perm))
+        return self.orders[k]
+
+    # A new source of shuffles for one deck, starting at the first shoe
+    def cursor(self):
+        return ShoeCursor(self)
+
+class ShoeCursor:
+    """ Replays the shoes of a ShoeCache. It stands in for the rng of a
+    Deck, since it has a shuffle(list) method.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.k = 0
+
+    def shuffle(self, lst):
+        perm = self.cache.order(self.k)
+        self.k += 1
+        lst[:] = [lst[i] for i in perm]
+
 #------------------------------------------------------------------------------
 #       Hand == collection of cards
 #------------------------------------------------------------------------------
 class Hand:
-    """ Collection of cards for an individual player. """
-    def __init__(self, c=[]):
+    """ Collection of cards for an individual player.
+    The rendered strings of the hand are cached, and rebuilt only after the
+    hand changes. Code that changes self.cards (or turns its cards over)
+    other than through the methods of Hand must call touch().
+    """
+    def __init__(self, c=None, bet=0.0):
+        if c is None: c = []
         if type(c) is not list: c = [c]
         self.cards = c
         self.score = 0   # score set by each game
+        self.soft = False  # whether score counts an ace as 11 (blackjack)
+        self.bet = bet   # stake riding on this hand
+        self.touch()
+
+    # Drop the cached strings of the hand
+    def touch(self):
+        self._str = None
+        self._upStr = None
+
+    # Empty the hand in place, so it can be reused (see HandPool)
+    def reset(self, bet=0.0):
+        del self.cards[:]
+        self.score = 0
+        self.soft = False
+        self.bet = bet
+        self.touch()
 
     # Add and remove cards from hand
     def addCard(self, cards):
-        if type(cards) is not list: cards = [cards]
-        for c in cards:
-            self.cards.append(c)
+        if type(cards) is list:
+            self.cards.extend(cards)
+        else:
+            self.cards.append(cards)
+        self.touch()
 
     def playCard(self, card):
         if card in self.cards:
             self.cards.remove(card)
+            self.touch()
         else:
             raise RuntimeError("Player does not have card to play!")
 
+    # Turn every card in the hand face up
+    def turnAllUp(self):
+        for c in self.cards:
+            c.turnUp()
+        self.touch()
+
     # Sorting
     def sortBySuit(self):
         self.cards = sorted(self.cards, key=lambda s: s.getSuit())
+        self.touch()
 
     def sortByVal(self):
         self.cards = sorted(self.cards, key=lambda s: s.getVal())
+        self.touch()
 
     # Filters
     def faceUpCards(self):
@@ -267,10 +601,18 @@ class Hand:
     def forAllCards(self, op):
         return list(map(op, self.cards))
 
-    # Determine if hand has a pair
+    # Determine if hand is a pair (two cards of the same value)
     def hasPair(self):
-        # NOTE slow for big lists
-        return any([self.cards.count(x) for x in self.cards])
+        return len(self.cards) == 2 and self.cards[0] == self.cards[1]
+
+    # Split a pair: move the second card into a new hand with the same stake
+    def split(self, pool=None):
+        if not self.hasPair():
+            raise RuntimeError("Hand is not a pair!")
+        new = pool.acquire(self.bet) if pool is not None else Hand(bet=self.bet)
+        new.addCard(self.cards.pop())
+        self.touch()
+        return new
 
     # Comparison between hands
     def __eq__(self, b):
@@ -281,15 +623,55 @@ class Hand:
 
     # Pretty print all cards in hand
     def __str__(self):
-        lst = [str(card) for card in self.cards]
-        if lst:
-            return "[\n  " + "\n  ".join(lst) + "\n]"
+        if self._str is None:
+            self._str = Hand.render(self.cards)
+        return self._str
+
+    # Pretty print the face-up cards only
+    def faceUpStr(self):
+        if self._upStr is None:
+            self._upStr = Hand.render([c for c in self.cards if c.faceup])
+        return self._upStr
+
+    @staticmethod
+    def render(cards):
+        if cards:
+            return "[\n  " + "\n  ".join(map(str, cards)) + "\n]"
         else:
             return ""
 
     def __repr__(self):
         return pprint.pformat(self.__dict__)
 
+#------------------------------------------------------------------------------
+#       Pool of reusable hands
+#------------------------------------------------------------------------------
+class HandPool:
+    """ Free list of Hand objects. Hands are reset in place when released, so
+    that a game loop in steady state reuses the same hands every round
+    instead of allocating new ones.
+    """
+
+    def __init__(self):
+        self.free = []
+
+    def acquire(self, bet=0.0):
+        if self.free:
+            h = self.free.pop()
+            h.bet = bet
+            return h
+        return Hand(bet=bet)
+
+    def release(self, h):
+        h.reset()
+        self.free.append(h)
+
+    def __len__(self):
+        return len(self.free)
+
+# Hands of every player are recycled through one pool
+Player.POOL = HandPool()
+
 #------------------------------------------------------------------------------
 #       Individual Cards
 #------------------------------------------------------------------------------
@@ -333,32 +715,27 @@ class Card:
     #--------------------------------------------------------------------------
     #        Pretty-printing
     #--------------------------------------------------------------------------
-    def suitAsStr(self):
-        opt = { Card.SPADES   : "Spades",
-                Card.HEARTS   : "Hearts",
-                Card.DIAMONDS : "Diamonds",
-                Card.CLUBS    : "Clubs",
+    SUIT_STR = { SPADES   : "Spades",
+                 HEARTS   : "Hearts",
+                 DIAMONDS : "Diamonds",
+                 CLUBS    : "Clubs",
+               }
+
+    VAL_STR = { ACE   : "Ace",
+                JACK  : "Jack",
+                QUEEN : "Queen",
+                KING  : "King",
               }
-        return opt[self.suit]
+
+    def suitAsStr(self):
+        return Card.SUIT_STR[self.suit]
 
     def valAsStr(self):
-        opt = { Card.ACE   : "Ace",
-                Card.JACK  : "Jack",
-                Card.QUEEN : "Queen",
-                Card.KING  : "King",
-                }
-
-        if self.val in opt:
-            return opt[self.val]
-        else:
-            return str(self.val)
+        return Card.VAL_STR.get(self.val) or str(self.val)
 
+    # Labels are precomputed for every card (see Card.LABELS below)
     def __str__(self):
-        if self.faceup:
-            facestr = " (face up)"
-        else:
-            facestr = " (face down)"
-        return self.valAsStr() + " of " + self.suitAsStr() + facestr
+        return Card.LABELS[self.val][self.suit][self.faceup]
 
     def __repr__(self):
         return pprint.pformat(self.__dict__)
@@ -377,6 +754,14 @@ class Card:
     def __lt__(self, b):
         return self.val < b.val
 
+# Interned label of each card, indexed as LABELS[val][suit][faceup]
+Card.LABELS = [[[ sys.intern("{} of {}{}".format(
+                    Card.VAL_STR.get(val) or str(val), Card.SUIT_STR[suit],
+                    " (face up)" if up else " (face down)"))
+                  for up in (False, True) ]
+                for suit in range(4) ]
+              for val in range(14) ]
+
 #------------------------------------------------------------------------------
 #       Main function
 #------------------------------------------------------------------------------
@@ -401,6 +786,7 @@ if __name__ == "__main__":
     print(p1)
     p2 = Player("Bob", 56, isUser=False)
     h1.cards[0].faceup = True
+    h1.touch()
     p2.addHand(h1)
     print(p2)
     print(b == c) # True
@@ -7,9 +7,13 @@
 """
   Description: General wrapper to manage card games. Can start new games,
   resume old (not yet implemented), or just exit.
+
+  Usage: python -O casino.py                         (interactive)
+         python casino.py simulate --config run.toml (batch, see batch.py)
 """
 #==============================================================================
 
+import argparse
 import pickle
 import os
 import sys
@@ -17,6 +21,10 @@ import sys
 import casinogame
 from casinogame import GamePause
 
+# Game plugins register themselves with casinogame.GAMES when imported
+import baccarat
+import holdem
+
 def ls_sort_mtime(path):
     ''' Sort files in path by mtime. '''
     mtime = lambda f: os.stat(os.path.join(path, f)).st_mtime
@@ -60,20 +68,19 @@ class Casino:
             else:
                 print("Invalid input. Press ? for help.")
 
-    # TODO put in options for other games here
+    # Menu of every registered game (see casinogame.registerGame)
     def __gameMenu(self):
         print("---------- Choose a game: ----------\n"
-              "  ? -- print this menu\n"
-              "  1 -- blackjack\n"
-              "       ...more coming soon!")
+              "  ? -- print this menu\n" +
+              "\n".join("  {} -- {}".format(k, g.TITLE)
+                        for k, g in casinogame.GAMES.items()))
 
     def __gameParse(self, p):
-        opt = { '?' : self.__gameMenu,
-                '1' : self.__Blackjack 
-              }
         if p:
-            if p in opt:
-                opt[p]()
+            if p == '?':
+                self.__gameMenu()
+            elif p in casinogame.GAMES:
+                self.__startGame(casinogame.GAMES[p])
             else:
                 print("Invalid input.")
 
@@ -93,19 +100,21 @@ class Casino:
                 # Drop back into casino outer loop, so print menu
                 self.__casinoMenu()
 
-    # Some way to make this function generic? i.e. just take "Blackjack" as
-    # argument and run init, then play "new game". Then that game object is
-    # stored so we could pause, drop back into casino.run() and then resumeGame
-    # by using "g.play()" again. Also works for re-loading saved game.
-    def __Blackjack(self):
-        g = casinogame.Blackjack()
-        _GAME_LIST.append(g)
+    # Start a new game of the given class. The game object is stored so we
+    # can pause, drop back into casino.run() and then resumeGame by using
+    # "g.play()" again. Also works for re-loading saved game.
+    def __startGame(self, game):
+        g = game()
+        Casino._GAME_LIST.append(g)
         g.gameInit(useDefaults=True) # start with default, user can change later
         g.play()
 
     # Resume paused game
-    def resumeGame(self, g):
-        g = _GAME_LIST.pop()
+    def resumeGame(self):
+        if not Casino._GAME_LIST:
+            print("No paused game!")
+            return
+        g = Casino._GAME_LIST.pop()
         g.play()
 
     # Load saved game
@@ -141,8 +150,20 @@ class Casino:
 #       Main loop
 #------------------------------------------------------------------------------
 if __name__ == "__main__":
-    casino = Casino()
-    casino.run()
+    parser = argparse.ArgumentParser(description="Play casino games.")
+    sub = parser.add_subparsers(dest="command")
+    sim = sub.add_parser("simulate", help="run headless tables from a config "
+                         "file, and print JSON lines")
+    sim.add_argument("--config", required=True,
+                     help="TOML (or .json) config file")
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        import batch
+        batch.run(batch.loadConfig(args.config))
+    else:
+        casino = Casino()
+        casino.run()
 
 #==============================================================================
 #==============================================================================
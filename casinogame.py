@@ -5,21 +5,66 @@
 #   Author: Bernie Roesler
 #
 """
-  Description: Set up and play a game of blackjack!
+  Description: Set up and play casino games: the core of a card game at a
+  table, the registry of games the casino offers, and blackjack.
 """
 #==============================================================================
 # Standard imports
+import itertools
 import pickle
+import queue
 import random
+import select
 import sys
+import threading
 import time
 
 # Get random names for computer players
 import names
+import numpy as np
 
 # Custom imports
 import cards
-from my_util import cmp, flatten
+import metrics
+import strategy
+from my_util import cmp
+from rules import RuleSet
+
+# Time the decision being made in this thread is due, if any (see ask)
+_decision = threading.local()
+
+class _Decider:
+    """ Worker thread which makes the decisions of a game one at a time, so
+    that the game can give up on a decision at its deadline without starting
+    a thread for every decision. A worker still busy past the deadline is
+    left behind (it is a daemon thread), and the game starts a new one.
+    """
+
+    def __init__(self):
+        self.jobs = queue.SimpleQueue()
+        self.done = queue.SimpleQueue()
+        threading.Thread(target=self.__work, name="decision",
+                         daemon=True).start()
+
+    def __work(self):
+        while True:
+            due, choose, args = self.jobs.get()
+            _decision.due = due
+            try:
+                self.done.put((choose(*args), None))
+            except DecisionTimeout:
+                self.done.put((None, None))
+            except Exception as e:
+                self.done.put((None, e))
+
+    # choice of choose(*args), or None if it gave up at due. Raises any
+    # other error of the decision, and queue.Empty if it isn't made by due.
+    def decide(self, due, choose, args):
+        self.jobs.put((due, choose, args))
+        choice, err = self.done.get(timeout=max(due - time.monotonic(), 0.0))
+        if err is not None:
+            raise err
+        return choice
 
 #------------------------------------------------------------------------------
 #       Individual casino game
@@ -27,18 +72,43 @@ from my_util import cmp, flatten
 class CasinoGame:
     """ Individual casino game class """
     _SAVE_DIR = "./.casino_save/"
+    _IDS = itertools.count()   # tables opened by this process
 
     def __init__(self, name=""):
         self.name = name
         self._PROMPT = "({})> ".format(self.name)
         self.table = None
+        self.verbose = True   # narrate the game (False to run headless)
+        self.rounds = 0       # number of rounds played
+        self.log = None       # SessionLog recording the game, if any
+        self.replay = None    # source of replayed decisions, if any
+        self.tableId = "{}-{}".format(name, next(CasinoGame._IDS))  # metrics
+        self.deadline = None   # [s] time allowed per decision (None: no limit)
+        self.decider = None    # worker making timed decisions (see decide)
+
+    # Narrate the game, like print
+    def say(self, *args):
+        if self.verbose:
+            print(*args)
+
+    # The log, replay source and decision worker belong to the session, not
+    # the game state
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['log'] = None
+        state['replay'] = None
+        state['decider'] = None
+        return state
 
     def __save(self):
+        t0 = time.perf_counter()
         # save game with time-stamp
         pickle_file = self._SAVE_DIR \
                 + "{}_pickle_dump_".format(self.name) \
                 + str(int(time.mktime(time.localtime())))
-        pickle.dump(self, open(pickle_file, "wb"))
+        with open(pickle_file, "wb") as fp:
+            pickle.dump(self, fp)
+        metrics.SAVE_SECONDS.get(self.name).observe(time.perf_counter() - t0)
 
     # Pause game drops back into main loop
     def __pause(self):
@@ -110,17 +180,110 @@ class CasinoGame:
             else:
                 print("Invalid input. Press ? for help.")
 
+    # Play one round, recording it if the game is logged
     def playRound(self):
+        t0 = time.perf_counter()
+        if self.log is not None:
+            self.log.beginRound(self)
+        self.gameRound()
+        self.rounds += 1
+        if self.log is not None:
+            self.log.endRound(self)
+        metrics.ROUNDS.get(self.tableId).inc()
+        metrics.ROUND_SECONDS.get(self.tableId).observe(time.perf_counter() - t0)
+
+    # Logic of one round, defined by each game
+    def gameRound(self):
         pass
 
+    # Decision for the player at seat, replayed from a log if replaying,
+    # else from choose(seat, *args), and recorded if the game is logged.
+    # With a deadline, a decision that takes longer is replaced by
+    # default(seat, *args), so one slow player, human or computer, can't
+    # stall the table.
+    def decide(self, choose, seat, *args, default=None):
+        if self.replay is not None:
+            choice = self.replay.next()
+        else:
+            label = str(self.table.seat.index(seat))
+            t0 = time.perf_counter()
+            if self.deadline is None or default is None:
+                choice = choose(seat, *args)
+            else:
+                choice = self.__timed(choose, seat, *args)
+                if choice is None:
+                    self.say("{} ran out of time!".format(seat.player.name))
+                    metrics.TIMEOUTS.get(self.tableId, label).inc()
+                    choice = default(seat, *args)
+            metrics.DECISION_SECONDS.get(self.tableId, label) \
+                    .observe(time.perf_counter() - t0)
+        if self.log is not None:
+            self.log.decision(choice)
+        metrics.DECISIONS.get(self.tableId, choice).inc()
+        return choice
+
+    # Run choose(*args) in the decision worker until the deadline, and return
+    # its choice, or None if it ran out of time. Any other error of the
+    # decision is raised here. A player still deciding is left behind in
+    # the old worker, and gets DecisionTimeout from its next ask().
+    def __timed(self, choose, *args):
+        due = time.monotonic() + self.deadline
+        if getattr(self, 'decider', None) is None:
+            self.decider = _Decider()
+        try:
+            return self.decider.decide(due, choose, args)
+        except queue.Empty:
+            self.decider = None
+            return None
+
+    # Read a line of user input, like input(), but give up with
+    # DecisionTimeout once the decision of this thread is due
+    def ask(self, prompt=""):
+        due = getattr(_decision, 'due', None)
+        if due is None:
+            return input(prompt)
+        print(prompt, end="", flush=True)
+        left = due - time.monotonic()
+        if left <= 0 or not select.select([sys.stdin], [], [], left)[0]:
+            raise DecisionTimeout
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip("\n")
+
     def gameInit(self):
         pass
 
+    # Set up a table of computer players only, to run headless
+    def botInit(self):
+        pass
+
 #------------------------------------------------------------------------------
-#       Blackjack game class
+#       Registry of games
 #------------------------------------------------------------------------------
-class Blackjack(CasinoGame):
-    """ The actual logic of the blackjack game. """
+# Games offered by the casino, in menu order: menu key -> game class
+GAMES = {}
+
+# Class decorator which adds a game to the casino's menu
+def registerGame(cls):
+    GAMES[str(len(GAMES) + 1)] = cls
+    return cls
+
+#------------------------------------------------------------------------------
+#       Card game dealt from a shoe to a table
+#------------------------------------------------------------------------------
+class TableGame(CasinoGame):
+    """ Core of a card game dealt from a shoe to a table of seats, with the
+    dealer as the bank. A game on this core defines gameRound(), and TITLE
+    for the casino's menu (see registerGame).
+    Keyword inputs:
+        nd  -- number of decks in the shoe
+        rng -- source of shuffles for the shoe (see cards.Deck)
+    """
+    TITLE = ""
+
+    # Outcome of a settled hand for the player, for the metrics
+    OUTCOMES = { 1 : 'win', 0 : 'push', -1 : 'loss' }
 
     # Logical defaults
     DEFAULT_NP = 3    # number of players
@@ -128,13 +291,16 @@ class Blackjack(CasinoGame):
     DEFAULT_S  = 0    # user seat at table
     DEFAULT_MONEY = 1000.00
 
-    # default 6 decks
-    def __init__(self, nd=6):
+    def __init__(self, nd=6, rng=None):
         super().__init__(name=self.__class__.__name__)
         self.table  = None
-        self.deck   = cards.Deck(nd)
+        self.deck   = cards.Deck(nd, rng)
+        self.deck.reshuffle()
         self.user   = None    # Keep track who the interactive user is
         self.dealer = None
+        self.wallets = []     # wallets of each seat before the last round
+        self.betting = None   # bet sizer (see betting.py), else the minimum
+        self.departed = []    # players who ran out of money and left
 
     # Prompt user to set up game variables. Creates new instance of the Table.
     def gameInit(self, useDefaults=True):
@@ -143,95 +309,280 @@ class Blackjack(CasinoGame):
             useDefaults = (choice == "y")
 
         if useDefaults:
-            np = Blackjack.DEFAULT_NP
-            m  = Blackjack.DEFAULT_M
+            nPlayers = self.DEFAULT_NP
+            m  = self.DEFAULT_M
             n  = "TheUser"
         else:
             n  = input(self._PROMPT+" What is your name? > ") or ""
-            np = input(self._PROMPT+" Enter number of players > ") \
-                    or Blackjack.DEFAULT_NP
+            nPlayers = input(self._PROMPT+" Enter number of players > ") \
+                    or self.DEFAULT_NP
             m  = input(self._PROMPT+" Enter minimum bet > $") \
-                    or Blackjack.DEFAULT_M
+                    or self.DEFAULT_M
 
         # Use defaults here
-        s  = Blackjack.DEFAULT_S
-        mo = Blackjack.DEFAULT_MONEY
+        s  = self.DEFAULT_S
+        mo = self.DEFAULT_MONEY
 
         # Create Table
-        self.table = cards.Table(int(np), float(m))
+        self.table = cards.Table(int(nPlayers), float(m))
 
         # Create dealer -- special seat outside of "table" with "unlimited" money
         self.dealer = cards.Seat(cards.Player(name="Dealer",m=1e9))
 
         # Create user-Player
-        self.user = cards.Player(n, mo, isUser=True)
+        self.user = cards.Player(n, mo, isUser=True, store=self.table.store)
         self.table.seatPlayer(self.user, int(s))
 
         # Create computer Players to fill table
         self.table.around(self.__genPlayer)
 
+    # Fill a table with computer players only, each with the same wallet
+    # and playing policy (see strategy.py), with bets sized by betting. The
+    # number of players, minimum bet and wallet default to those of the game.
+    def botInit(self, nPlayers=None, m=None, money=None, policy=None,
+                betting=None):
+        nPlayers = nPlayers if nPlayers is not None else self.DEFAULT_NP
+        m        = m if m is not None else self.DEFAULT_M
+        money    = money if money is not None else self.DEFAULT_MONEY
+        self.table  = cards.Table(int(nPlayers), float(m))
+        self.dealer = cards.Seat(cards.Player(name="Dealer",m=1e9))
+        self.user   = None
+        self.betting = betting
+        for seat in self.table.seat:
+            p = cards.Player(names.get_first_name(), money, isUser=False,
+                             store=self.table.store, policy=policy)
+            seat.fillSeat(p)
+
     # Create computer player
     def __genPlayer(self, seat):
         if seat.isEmpty:
             n = names.get_first_name()
-            m = random.randrange( 0.5*Blackjack.DEFAULT_MONEY,
-                                 10.0*Blackjack.DEFAULT_MONEY)
-            p = cards.Player(n, m, isUser=False)
+            m = random.randrange( 0.5*self.DEFAULT_MONEY,
+                                 10.0*self.DEFAULT_MONEY)
+            p = cards.Player(n, m, isUser=False, store=self.table.store)
             seat.fillSeat(p)
 
+    #--------------------------------------------------------------------------
+    #        Perform ops for entire table
+    #--------------------------------------------------------------------------
+    # Shuffle the shoe once it has been dealt past the penetration
+    def checkShoe(self, penetration):
+        if self.deck.dealtFraction() >= penetration:
+            self.deck.reshuffle()
+            metrics.RESHUFFLES.get(self.tableId).inc()
+
+    # Put all players' cards on the discard pile
+    def clearTable(self):
+        self.table.around(self.clearHand)
+        self.clearHand(self.dealer)
+
+    # Dealer is the bank, so only the table bets. Keep each player's wallet
+    # from before the bets, to give the net result of the round. The bets of
+    # all seats are sized at once.
+    def placeBets(self):
+        if len(self.wallets) != self.table.n_seats:
+            self.wallets = [None] * self.table.n_seats
+        for i, s in enumerate(self.table.seat):
+            self.wallets[i] = None if s.isEmpty else float(s.player.money)
+        seated = [ s for s in self.table.seat if not s.isEmpty ]
+        if not seated:
+            return
+        rows = np.array([ s.player.row for s in seated ], dtype=np.intp)
+        for seat, b in zip(seated, self.betSizes(rows).tolist()):
+            self.takeBet(seat, b)
+
+    # Bets of the players in rows of the table's store, from the bet sizer,
+    # at least the table minimum and at most each player's wallet
+    def betSizes(self, rows):
+        m = self.table.minbet
+        if self.betting is None:
+            bets = np.full(len(rows), m)
+        else:
+            bets = np.maximum(self.betting(self, rows), m)
+        return np.minimum(bets, self.table.store.money[rows])
+
+    # Perform op on each seat in turn. The seats still to go are the table's
+    # queue depth.
+    def aroundQueue(self, op):
+        depth = metrics.QUEUE_DEPTH.get(self.tableId)
+        depth.set(sum(1 for s in self.table.seat if not s.isEmpty))
+        def queued(seat):
+            op(seat)
+            if not seat.isEmpty:
+                depth.dec()
+        self.table.around(queued)
+        depth.set(0)
+
+    # List of (seat number, net result, bankroll) of the last round, for each
+    # seat that played it
+    def roundResults(self):
+        res = []
+        for i, s in enumerate(self.table.seat):
+            w = self.wallets[i]
+            if (w is not None) and (not s.isEmpty):
+                m = float(s.player.money)
+                res.append((i, m - w, m))
+        return res
+
+    #--------------------------------------------------------------------------
+    #        Individual Player Methods: all take seat index and seat object
+    #--------------------------------------------------------------------------
+    # Put player's cards on the discard pile
+    def clearHand(self, seat):
+        if not seat.isEmpty:
+            for h in seat.player.hand:
+                for c in h.cards:
+                    self.deck.discardCard(c)
+            seat.player.discardAllHands()  # return hands to the pool
+
+    # Deal cards to a player
+    def deal(self, ncard=1, faceup=False):
+        def op(seat):
+            if not seat.isEmpty:
+                # Deal ncards to player at seat
+                for n in range(ncard):
+                    c = self.deck.dealCard(faceup)
+                    seat.player.receiveCard(c)
+                    # Status update
+                    if c.faceup:
+                        self.say(seat.player.name, "received", c)
+                    else:
+                        self.say(seat.player.name, "received card face down.")
+        return op
+
+    # Deal one card to a particular hand of a player
+    def dealToHand(self, seat, h, faceup=True):
+        c = self.deck.dealCard(faceup)
+        h.addCard(c)
+        self.say(seat.player.name, "received", c)
+
+    # Take a bet (default: the table minimum) from a player, which opens the
+    # player's first hand. A player who can't cover the minimum bet leaves
+    # the table.
+    def takeBet(self, seat, bet=None):
+        if not seat.isEmpty:
+            bet = self.table.minbet if bet is None else bet
+            if bet < self.table.minbet or bet > seat.player.money:
+                self.say("{} is out of money, and leaves the table."
+                         .format(seat.player.name))
+                self.departed.append(seat.player)
+                seat.vacateSeat()
+            else:
+                seat.player.placeBet(bet)
+                seat.player.openHand(bet)
+
+    # Amount of a stake which goes back to the player's wallet when it is
+    # settled: the player wins (b > 0) and is paid pays per unit staked,
+    # pushes (b == 0), or loses (b < 0)
+    @staticmethod
+    def payout(stake, b, pays=1.0):
+        if b > 0:
+            return (1 + pays)*stake
+        elif b == 0:
+            return stake
+        return 0.0
+
+    # Take the stake off hand h of a seat, to settle with settleStakes
+    def handStake(self, seat, h, b, pays=1.0):
+        stake = h.bet
+        h.bet = 0.0
+        return (seat, stake, TableGame.payout(stake, b, pays))
+
+    # Settle stakes with the dealer, as a list of (seat, stake, back), where
+    # back is the amount returned to the player (see payout). The stakes are
+    # already out of the players' wallets, so they always leave player.bet.
+    # The wallets and bets of every seat are updated at once, in the table's
+    # PlayerStore, and the dealer keeps or pays the difference.
+    def settleStakes(self, stakes):
+        if not stakes:
+            return
+        n = len(stakes)
+        rows  = np.fromiter((s.player.row for s, x, r in stakes), np.intp, n)
+        stake = np.fromiter((x for s, x, r in stakes), np.float64, n)
+        back  = np.fromiter((r for s, x, r in stakes), np.float64, n)
+        store = self.table.store
+        np.subtract.at(store.bet, rows, stake)
+        store.credit(rows, back)
+        net = back - stake
+        self.dealer.player.money -= float(net.sum())
+
+        won, lost = net > 0, net < 0
+        metrics.PAID.get(self.tableId).inc(float(net[won].sum()))
+        for outcome, paid in ((1, won), (-1, lost), (0, ~(won | lost))):
+            metrics.SETTLED.get(self.tableId, TableGame.OUTCOMES[outcome]) \
+                    .inc(float(stake[paid].sum()))
+
+    def gameStatus(self):
+        self.dealer.player.playerStatus()
+        super().gameStatus() # just the table
+
+#------------------------------------------------------------------------------
+#       Blackjack game class
+#------------------------------------------------------------------------------
+@registerGame
+class Blackjack(TableGame):
+    """ The actual logic of the blackjack game. """
+    TITLE = "blackjack"
+
+    # default 6 decks, unless a RuleSet is given. rng is the source of
+    # shuffles for the deck (see cards.Deck).
+    def __init__(self, nd=6, rules=None, rng=None):
+        rules = rules if rules is not None else RuleSet(nDecks=nd)
+        super().__init__(rules.nDecks, rng)
+        self.rules = rules
+        self.insured = []   # insurance bet of each seat in this round
+
     #--------------------------------------------------------------------------
     #        Main Gameplay
     #--------------------------------------------------------------------------
     # Play a hand of blackjack
-    def playRound(self):
+    def gameRound(self):
         ### Clean up (return outstanding cards to deck)
         # NOTE putting clearTable here allows user to view the gameStatus at
         # the end of the hand, and then clear it for a new hand only
         self.clearTable()
 
-        ### Shuffle the deck!
-        self.deck.shuffle()
+        ### Shuffle the deck once it has been dealt past the penetration
+        self.checkShoe(self.rules.penetration)
 
         ### Place bets
         self.placeBets()
 
         ### Deal a round (one up, one down)
-        print("...Dealing the round...")
+        self.say("...Dealing the round...")
         self.dealRound()
 
         ### Score everyone's hands
         self.scorePlayers()
 
         ### If dealer has Ace, ask if anyone wants insurance
-        # if Blackjack.hasAce(self.dealer):
-        #     self.table.around(self.askInsurance)
+        self.insured = [0.0] * self.table.n_seats
+        if self.upCard() == 1:
+            self.aroundQueue(self.offerInsurance)
 
         ### Check for dealer blackjack
-        if self.hasBlackjack(self.dealer):
-            print("Dealer has blackjack!")
+        dealer_bj = self.hasBlackjack(self.dealer)
+        self.settleInsurance(dealer_bj)
+        if dealer_bj:
+            self.say("Dealer has blackjack!")
             self.settleBets()
             return
 
         ### for each player, choose option
-        print("...Time to play!...")
+        self.say("...Time to play!...")
         self.playHands()
 
         ### dealer plays (special rules for dealer)
-        print("...Dealer's turn...")
+        self.say("...Dealer's turn...")
         self.dealerPlay()
 
         ### Settle bets
-        print("...Settling bets...")
+        self.say("...Settling bets...")
         self.settleBets()
 
     #--------------------------------------------------------------------------
     #        Perform ops for entire table
     #--------------------------------------------------------------------------
-    # Return all players' cards to the deck
-    def clearTable(self):
-        self.table.around(self.clearHand)
-        self.clearHand(self.dealer)
-
     # Deal a round
     def dealRound(self):
         # Deal 1 face-down
@@ -248,163 +599,168 @@ class Blackjack(CasinoGame):
 
     # Play all players' hands
     def playHands(self):
-        self.table.around(self.playHand)
-
-    def placeBets(self):
-        self.takeBet(self.dealer)
-        self.table.around(self.takeBet)
+        self.aroundQueue(self.playHand)
 
-    # Settle all players' bets with the dealer
+    # Settle all players' bets with the dealer, at once
     def settleBets(self):
-        self.table.around(self.settleBet(self.dealer))
+        stakes = []
+        self.table.around(self.settleBet(self.dealer, stakes))
+        self.settleStakes(stakes)
 
     #--------------------------------------------------------------------------
     #        Individual Player Methods: all take seat index and seat object
     #--------------------------------------------------------------------------
-    # Return player's cards to the deck
-    def clearHand(self, seat):
-        if not seat.isEmpty:
-            def returnCards(h):
-                h.forAllCards(self.deck.returnCard)
-            seat.player.forAllHands(returnCards)
-            seat.player.discardAllHands()  # clear player's hands
-
-    # Deal cards to a player
-    def deal(self, ncard=1, faceup=False):
-        def op(seat):
-            if not seat.isEmpty:
-                # Deal ncards to player at seat
-                for n in range(ncard):
-                    c = self.deck.dealCard(faceup)
-                    seat.player.receiveCard(c)
-                    # Status update
-                    if c.faceup:
-                        print(seat.player.name, "received", c)
-                    else:
-                        print(seat.player.name, "received card face down.")
-        return op
-
-    # Take minimum bet from player
-    def takeBet(self, seat):
-        if not seat.isEmpty:
-            hasBet = seat.player.placeBet(self.table.minbet)
-            if not hasBet:
-                seat.vacateSeat()
-
     # Sum the value of cards in each hand
     def scorePlayer(self, seat):
         if not seat.isEmpty:
             seat.player.forAllHands(self.scoreHand)
 
     def scoreHand(self, hand):
-        # Create list of "blackjack" values of cards
-        vals = [card.val for card in hand.cards]
-
-        # Face cards == 10
-        def fil(x):
-            return x if (x < 10) else 10
-        bj_vals = list(map(fil, vals))
-        score_a = sum(bj_vals)
-
-        # Determine value of aces
-        ace_ind = [i for i, x in enumerate(bj_vals) if x == cards.Card.ACE]
-        if (not ace_ind) or (score_a > 21):
-            hand.score = score_a
+        # Sum "blackjack" values of cards, with face cards == 10 and aces == 1
+        score_a = 0
+        has_ace = False
+        for card in hand.cards:
+            v = card.val
+            score_a += v if (v < 10) else 10
+            has_ace = has_ace or (v == cards.Card.ACE)
+
+        # Count one ace as 11, if it doesn't bust the hand (two would)
+        if has_ace and (score_a <= 11):
+            hand.score = score_a + 10
+            hand.soft = True
         else:
-            # Set aces to 11
-            for i in ace_ind: 
-                bj_vals[i] = 11
-            score_b = sum(bj_vals)
-            if score_b > 21:
-                hand.score = score_a
-            else:
-                hand.score = score_b
-
-    def settleBet(self, other):
-        print("Dealer has: ", other.player.getFirstHand().score)
-
-        # Transfer money from a to b
-        def transfer(a, b):
-            b.player.money += a.player.bet + b.player.bet
-            a.player.bet = 0.0
-            b.player.bet = 0.0
-
-        # Compare two hands and return -1 if a < b, 0 if a == b, 1 if a > b
+            hand.score = score_a
+            hand.soft = False
+
+    # Procedure which settles the hands of a seat with other (the dealer),
+    # adding their stakes to the list stakes (see settleStakes)
+    def settleBet(self, other, stakes):
+        # The dealer only ever has one hand
+        dealer = other.player.getFirstHand()
+        self.say("Dealer has: ", dealer.score)
+        dealer_bj = self.isNatural(other, dealer)
+
+        # Compare two hands and return -1 if a < b, 0 if a == b, 1 if a > b.
+        # A player (a) who busts loses, even if the dealer busts too.
         def compare(a, b):
-            if (a.score > 21) and (b.score > 21):
-                return 0   # it's a tie!
-            elif a.score > 21:
+            if a.score > 21:
                 return -1  # "a < b" so b wins
             elif b.score > 21:
                 return 1   # "a > b" so a wins
             else:
                 return cmp(a, b)
 
-        # NOTE what we're really doing with lambda_x and op:
-        # lst = map(lambda x: 
-        #         map(lambda y: cmp(x,y), 
-        #             dealer.hand), 
-        #         player.hand)
-        # BUT our operations are INDEPEDENT of the implementation of seats,
-        # players and hands!
-
-        # a procedure that takes the player's hand as the argument, and returns
-        # a procedure that loops over all of the other player's hands
-        def lambda_x(x):
-            # return a procedure that takes one argument
-            return other.player.forAllHands(lambda y: compare(x, y))
-
-        # a procedure that takes player's seat as argument, and settles all of
-        # the bets with the dealer
+        # a procedure that takes player's seat as argument, and settles each
+        # of the player's hands with the dealer's hand
         def op(seat):
             if not seat.isEmpty:
                 thename = "### You" if seat.player.isUser else seat.player.name
-                # A procedure that returns a list given a procedure that is
-                # a function of one element (i.e. map)
-                lst = flatten(seat.player.forAllHands(lambda_x))
-                for b in lst:
+                for h in seat.player.hand:
+                    b = compare(h, dealer)
+                    if h.bet == 0: # surrendered, already settled
+                        continue
+                    # A natural beats any other 21, and pays extra
+                    pays = 1.0
+                    if self.isNatural(seat, h) and not dealer_bj:
+                        b = 1
+                        pays = self.rules.bjPayout
                     if b > 0:  # player won!
-                        print("{} won ${}!".format(thename, seat.player.bet))
-                        transfer(other, seat)
+                        self.say("{} won ${}!".format(thename, pays*h.bet))
                     if b == 0: # push
-                        print("{} pushed.".format(thename))
-                        # NOTE "negative" bet just returns money to wallet
-                        seat.player.placeBet(-seat.player.bet)
-                        other.player.placeBet(-other.player.bet)
+                        self.say("{} pushed.".format(thename))
                     if b < 0:  # dealer won!
-                        print("{} lost ${} :(".format(thename, seat.player.bet))
-                        transfer(seat, other)
+                        self.say("{} lost ${} :(".format(thename, h.bet))
+                    stakes.append(self.handStake(seat, h, b, pays))
         return op
 
+    # Two-card 21 on the player's only hand (not after a split)
+    def isNatural(self, seat, h):
+        return (h.score == 21) and (len(h.cards) == 2) \
+                and (seat.player.n_hands == 1)
+
+    # Peek at the dealer's hole card: the dealer only ever has one hand, so
+    # check it directly
     def hasBlackjack(self, seat):
-        if not seat.isEmpty:
-            def op(h):
-                if h.score == 21:
-                    return True
-                return False
-            bj_bool = seat.player.forAllHands(op)
-            return any([x for x in bj_bool if x])
-        else:
+        if seat.isEmpty or not seat.player.n_hands:
             return False
+        h = seat.player.getFirstHand()
+        return (h.score == 21) and (len(h.cards) == 2)
+
+    #--------------------------------------------------------------------------
+    #        Insurance
+    #--------------------------------------------------------------------------
+    # Insurance is a side bet of half the bet that the dealer's hole card is
+    # a ten, which pays 2:1. On a natural it is "even money": the player is
+    # paid 1:1 whatever the dealer has.
+    def offerInsurance(self, seat):
+        if seat.isEmpty or not seat.player.n_hands:
+            return
+        h = seat.player.getFirstHand()
+        stake = 0.5*h.bet
+        if stake > seat.player.money:
+            return
+        choice = self.decide(self.__chooseInsurance, seat, h,
+                             default=self.__timeoutInsurance)
+        if choice == 'i' and seat.player.placeBet(stake):
+            self.insured[self.table.seat.index(seat)] = stake
+            if self.isNatural(seat, h):
+                self.say("{} takes even money.".format(seat.player.name))
+            else:
+                self.say("{} takes insurance.".format(seat.player.name))
+
+    # Insurance bets win if the dealer has blackjack, and lose otherwise
+    def settleInsurance(self, dealer_bj):
+        stakes = []
+        b = 1 if dealer_bj else -1
+        for seat, stake in zip(self.table.seat, self.insured):
+            if stake and not seat.isEmpty:
+                if dealer_bj:
+                    self.say("{} won ${} on insurance!".format(
+                             seat.player.name, 2.0*stake))
+                else:
+                    self.say("{} lost the insurance bet.".format(
+                             seat.player.name))
+                stakes.append((seat, stake, TableGame.payout(stake, b, 2.0)))
+        self.settleStakes(stakes)
+        self.insured = [0.0] * self.table.n_seats
+
+    # Probability that the dealer's hole card is a ten, given the cards the
+    # players have seen. The unseen cards are the cards left in the shoe and
+    # the hole card; the number of tens among them is the number in a full
+    # shoe less the tens seen, so counting the hole card back in uses nothing
+    # the players don't know. Constant time, from the shoe's ShoeIndex.
+    def tenDensity(self):
+        index = self.deck.index
+        tens = index.total - index.countAtMost(9)
+        n = index.total
+        for c in self.dealer.player.getFirstHand().faceDownCards():
+            tens += c.val >= 10
+            n += 1
+        return tens / n if n else 0.0
+
+    # Expected value of an insurance bet, per unit insured
+    def insuranceEV(self):
+        p = self.tenDensity()
+        return 2*p - (1 - p)
 
     #--------------------------------------------------------------------------
     #        Play the hand
     #--------------------------------------------------------------------------
     def playHand(self, seat):
         if not seat.isEmpty:
+            player = seat.player
+
             # Operation to perform on each hand a player has
             def play(h):
                 while True:
                     try:
                         # Check for bust
                         if h.score > 21:
-                            print("You busted!")
+                            self.say("You busted!")
                             break
 
-                        if __debug__:
-                            choice = "s"
-                        else:
-                            choice = self.__getChoice(seat, h)
+                        choice = self.decide(self.__choose, seat, h,
+                                             default=self.__timeoutChoice)
 
                         # Execute procedure
                         op = self.__handParse(choice)
@@ -415,54 +771,140 @@ class Blackjack(CasinoGame):
                     except BlackjackStand:
                         break
 
-            # Perform the operation on all hands
-            seat.player.forAllHands(play)
+            # Perform the operation on all hands. The player's list of hands
+            # is the work-queue: splitting appends the new hand to it, so walk
+            # it by index rather than iterating over it.
+            i = 0
+            while i < player.n_hands:
+                play(player.hand[i])
+                i += 1
 
-    # Dealer just hits until he has 17 or higher
+    # Dealer just hits until he has 17 or higher (or hits soft 17, if the
+    # rules say so)
     def dealerPlay(self):
+        h17 = self.rules.hitSoft17
         for h in self.dealer.player.hand:
             # Turn dealer cards face up
-            h.forAllCards(cards.Card.turnUp)
-            while h.score < 17:
+            h.turnAllUp()
+            while (h.score < 17) or (h17 and h.score == 17 and h.soft):
                 self.__handHit(self.dealer, h)
                 self.scoreHand(h)
 
+    # Which options the rules allow on a hand. Doubling and splitting also
+    # need the money for the extra bet.
+    def canDouble(self, seat, h):
+        return (len(h.cards) == 2) \
+                and (seat.player.n_hands == 1 or self.rules.doubleAfterSplit) \
+                and (seat.player.money >= h.bet)
+
+    def canSplit(self, seat, h):
+        return h.hasPair() and (seat.player.n_hands < self.rules.maxHands) \
+                and (seat.player.money >= h.bet)
+
+    def canSurrender(self, seat, h):
+        return self.rules.surrender and (len(h.cards) == 2) \
+                and (seat.player.n_hands == 1)
+
+    # Whether choice is a move of the hand menu that the rules allow on h
+    def canPlay(self, seat, h, choice):
+        if choice == 'd':
+            return self.canDouble(seat, h)
+        elif choice == 'x':
+            return self.canSurrender(seat, h)
+        elif choice == 'p':
+            return self.canSplit(seat, h)
+        return choice in ('h', 's')
+
+    # Value of the dealer's face-up card, with face cards as 10 and ace as 1
+    def upCard(self):
+        up = self.dealer.player.getFirstHand().faceUpCards()
+        return min(up[0].val, 10) if up else 0
+
     # Playing options for each (seat, hand)
     def __handHit(self, seat, h):
-        print("{}: \"Hit me!\"".format(seat.player.name))
-        # Deal one card to player
-        self.deal(ncard=1, faceup=True)(seat)
+        self.say("{}: \"Hit me!\"".format(seat.player.name))
+        # Deal one card to this hand
+        self.dealToHand(seat, h)
 
     def __handStand(self, seat, h):
         # Do nothing.
-        print("{}: \"I'll stand.\"".format(seat.player.name))
+        self.say("{}: \"I'll stand.\"".format(seat.player.name))
         raise BlackjackStand
 
     def __handDoubleDown(self, seat, h):
-        print("{}: \"Go big or go home!\"".format(seat.player.name))
+        if not self.canDouble(seat, h):
+            self.say("You can't double down on that hand!")
+            return
+        self.say("{}: \"Go big or go home!\"".format(seat.player.name))
         # Double bet, take one extra card, stand.
-        seat.player.placeBet(seat.player.bet)
-        self.deal(ncard=1, faceup=True)(seat)
+        if seat.player.placeBet(h.bet):
+            h.bet *= 2
+        self.dealToHand(seat, h)
+        self.scoreHand(h)   # stand skips the scoring in playHand
         # TODO print if player busted or not here
         raise BlackjackStand
 
     def __handSurrender(self, seat, h):
-        print("{}: \"I surrender :(\"".format(seat.player.name))
-        # Keep 1/2 bet only, house gets the rest
-        seat.player.money += 0.5*seat.player.bet
-        # TODO prevent loss message from being displayed, or display it here
-        seat.player.bet = 0  # Set bet to 0, and score to 0 so we guarantee loss
+        if not self.canSurrender(seat, h):
+            self.say("You can't surrender that hand!")
+            return
+        self.say("{}: \"I surrender :(\"".format(seat.player.name))
+        # Keep 1/2 bet only, house gets the rest. Settle now, so the hand
+        # is skipped when the table is settled.
+        seat.player.money += 0.5*h.bet
+        self.dealer.player.money += 0.5*h.bet
+        seat.player.bet -= h.bet
+        h.bet = 0.0
         h.score = 0
         raise BlackjackStand
 
     def __handSplit(self, seat, h):
-        pass
-        # print("{}: \"I'd like to split my hand.\"".format(seat.player.name))
-        # raise BlackjackStand
-        # TODO How to add to hands if we're iterating over list of hands??
-        # if h.hasPair():
-            # make another hand
-            # seat.player.addHand(...)
+        if not h.hasPair():
+            self.say("You can only split a pair!")
+            return
+        if seat.player.n_hands >= self.rules.maxHands:
+            self.say("You can't split any more hands!")
+            return
+        # New hand needs a matching bet
+        if not seat.player.placeBet(h.bet):
+            return
+        self.say("{}: \"I'd like to split my hand.\"".format(seat.player.name))
+        # New hand is played after this one (see playHand)
+        new = seat.player.splitHand(h)
+        self.dealToHand(seat, h)
+        self.dealToHand(seat, new)
+        self.scoreHand(new)
+
+    # Choice of a player who ran out of time
+    def __timeoutChoice(self, seat, h):
+        return strategy.basicStrategy(self, seat, h)
+
+    # A player who runs out of time declines insurance
+    def __timeoutInsurance(self, seat, h):
+        return 'n'
+
+    # Insurance choice of a player: computer players ask their policy (see
+    # strategy.insurance)
+    def __chooseInsurance(self, seat, h):
+        policy = seat.player.policy
+        if policy is not None:
+            return getattr(policy, 'insure', strategy.insurance)(self, seat, h)
+        elif __debug__ or not seat.player.isUser:
+            return 'n'
+        else:
+            return self.__getInsurance(seat, h)
+
+    # Choice of a player for a hand: computer players follow their policy. A
+    # policy which picks a move it can't make stands, rather than being
+    # asked again for ever.
+    def __choose(self, seat, h):
+        if seat.player.policy is not None:
+            c = seat.player.policy(self, seat, h)
+            return c if self.canPlay(seat, h, c) else "s"
+        elif __debug__:
+            return "s"
+        else:
+            return self.__getChoice(seat, h)
 
     #--------------------------------------------------------------------------
     #        Interface
@@ -475,14 +917,30 @@ class Blackjack(CasinoGame):
             print("### Your score for your hand is:", hand.score)
             print("### The dealer has:", self.dealer.player.getFirstHand().score)
             self.__handMenu()
-            return input(self._PROMPT)
+            while True:
+                c = self.ask(self._PROMPT)
+                if c in ('h', 's', 'd', 'x', 'p'):
+                    return c
+                if c != "?":
+                    print("Invalid input.")
+                self.__handMenu()
         else:   # Computer random choice
             # return self.chooseRand(seat.player, hand)
             return "s" # dummy out for now
 
-    def gameStatus(self):
-        self.dealer.player.playerStatus()   # dealer is unique to blackjack
-        super(Blackjack, self).gameStatus() # just the table
+    def __getInsurance(self, seat, hand):
+        print("########## The dealer shows an ace! ##########")
+        print("### Your hand is:\n{}".format(str(hand)))
+        if self.isNatural(seat, hand):
+            print("### Take even money? (i -- yes, n -- no)")
+        else:
+            print("### Insurance costs ${}, and pays 2:1 if the dealer has "
+                  "blackjack. (i -- insure, n -- no)".format(0.5*hand.bet))
+        while True:
+            c = self.ask(self._PROMPT)
+            if c in ('i', 'n'):
+                return c
+            print("Invalid input.")
 
     def __handMenu(self):
         print("---------- Options ----------\n"
@@ -511,6 +969,7 @@ class Blackjack(CasinoGame):
 # Just here for the exception
 class GamePause(Exception): pass
 class BlackjackStand(Exception): pass
+class DecisionTimeout(Exception): pass
 
 #==============================================================================
 #==============================================================================
@@ -0,0 +1,206 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: exact.py
+#  Created: 10/19/2026, 14:02
+#   Author: Bernie Roesler
+#
+"""
+  Description: Exact expected value of a blackjack strategy, by enumerating
+  every hand the strategy can play from a given shoe. Equivalent states are
+  only evaluated once, via a transposition table keyed on the remaining
+  composition of the shoe (see odds.py).
+"""
+#==============================================================================
+import pprint
+from concurrent.futures import ProcessPoolExecutor
+
+import odds
+from rules import RuleSet
+from strategy import basicAction
+
+#------------------------------------------------------------------------------
+#       Enumeration of one up-card
+#------------------------------------------------------------------------------
+class Enumeration:
+    """ Expected value of every hand against one dealer up-card.
+    Keyword inputs:
+        counts -- composition of the shoe, with the up-card already removed
+        up     -- value of the dealer up-card (ace == 1)
+        rules  -- RuleSet (dealer peeks for blackjack under an ace or ten)
+        action -- strategy as a procedure with the signature of
+                  strategy.basicAction
+    Splits are evaluated as two hands of one card each, drawn from the same
+    composition, with no re-splits.
+    """
+
+    def __init__(self, counts, up, rules, action=basicAction):
+        self.counts = counts
+        self.up     = up
+        self.rules  = rules
+        self.action = action
+        self.memo   = {}   # transposition table of player states
+        self.dmemo  = {}   # transposition table of dealer states
+        # Hole card which would give the dealer a natural
+        self.bjHole = 10 if up == 1 else (1 if up == 10 else 0)
+
+    # Distribution of the dealer's outcomes, from the dealer's hand
+    def dealer(self, counts, dHard, dAce):
+        return odds.dealerHand(counts, dHard, dAce, self.rules.hitSoft17,
+                               self.dmemo)
+
+    # EV of standing on score s
+    def stand(self, counts, s, dHard, dAce):
+        if s > 21:
+            return -1.0
+        return odds.standEV(s, self.dealer(counts, dHard, dAce))
+
+    def play(self, counts, hard, ace, first, pair, split, dHard, dAce):
+        """ EV of a hand played by the strategy from here on.
+            hard, ace -- hard total of the hand, and whether it has an ace
+            first     -- [boolean] hand still has its first two cards
+            pair      -- card value of a splittable pair, else 0
+            split     -- [boolean] hand came from a split
+            dHard, dAce -- dealer's hand so far
+        """
+        key = (counts, hard, ace, first, pair, split, dHard, dAce)
+        ev = self.memo.get(key)
+        if ev is not None:
+            return ev
+
+        s, soft = odds.score(hard, ace)
+        if s > 21:
+            ev = -1.0
+        else:
+            r = self.rules
+            canDouble = first and (r.doubleAfterSplit or not split)
+            canSurrender = first and r.surrender and not split
+            a = self.action(s, soft, pair, self.up, canDouble=canDouble,
+                            canSplit=bool(pair), canSurrender=canSurrender)
+            if a == 's':
+                ev = self.stand(counts, s, dHard, dAce)
+            elif a == 'x':
+                ev = -0.5
+            elif a == 'p':
+                ev = 2 * self.draw(counts, pair, pair == 1, dHard, dAce,
+                                   lambda c, h, a_: self.play(c, h, a_, True,
+                                                              0, True,
+                                                              dHard, dAce))
+            elif a == 'd':
+                ev = 2 * self.draw(counts, hard, ace, dHard, dAce,
+                                   lambda c, h, a_: self.stand(
+                                       c, odds.score(h, a_)[0], dHard, dAce))
+            else:
+                ev = self.draw(counts, hard, ace, dHard, dAce,
+                               lambda c, h, a_: self.play(c, h, a_, False,
+                                                          0, split,
+                                                          dHard, dAce))
+        self.memo[key] = ev
+        return ev
+
+    # Average of op(counts, hard, ace) over the next card drawn
+    def draw(self, counts, hard, ace, dHard, dAce, op):
+        n = sum(counts)
+        ev = 0.0
+        for v in range(1, 11):
+            c = counts[v-1]
+            if c:
+                ev += c / n * op(odds.remove(counts, v), hard + v,
+                                 ace or v == 1)
+        return ev
+
+    # EV of a two-card hand (a, b), given the dealer has no natural
+    def hand(self, counts, a, b, dHard, dAce):
+        pair = a if (a == b) else 0
+        return self.play(counts, a + b, a == 1 or b == 1, True, pair, False,
+                         dHard, dAce)
+
+    def run(self):
+        """ EV per unit bet against this up-card, summed over every player
+        two-card hand and, under an ace or ten, every dealer hole card.
+        """
+        up, bj = self.up, self.bjHole
+        C = self.counts
+        n = sum(C)
+        ev = 0.0
+        for a in range(1, 11):
+            if not C[a-1]:
+                continue
+            pa = C[a-1] / n
+            Ca = odds.remove(C, a)
+            for b in range(1, 11):
+                if not Ca[b-1]:
+                    continue
+                pb = Ca[b-1] / (n - 1)
+                Cab = odds.remove(Ca, b)
+                natural = (a + b == 11) and (a == 1 or b == 1)
+
+                if not bj:
+                    # Hole card is drawn after the player, which is
+                    # equivalent since the strategy can't see it
+                    if natural:
+                        e = self.rules.bjPayout
+                    else:
+                        e = self.hand(Cab, a, b, up, up == 1)
+                else:
+                    # Dealer peeks: enumerate the hole card explicitly
+                    m = n - 2
+                    q = Cab[bj-1] / m
+                    if natural:
+                        e = (1 - q) * self.rules.bjPayout
+                    else:
+                        e = -q
+                        for h in range(1, 11):
+                            if h == bj or not Cab[h-1]:
+                                continue
+                            e += Cab[h-1] / m * self.hand(
+                                    odds.remove(Cab, h), a, b,
+                                    up + h, up == 1 or h == 1)
+                ev += pa * pb * e
+        return ev
+
+# Module-level, so that it can be sent to a process pool
+def _upcardEV(args):
+    return Enumeration(*args).run()
+
+#------------------------------------------------------------------------------
+#       House edge over all up-cards
+#------------------------------------------------------------------------------
+def houseEdge(rules=None, action=basicAction, counts=None, processes=None):
+    """ Exact house edge of a strategy.
+    Keyword inputs:
+        rules     -- RuleSet (default: RuleSet())
+        action    -- strategy, with the signature of strategy.basicAction
+        counts    -- composition of the shoe (default: a full shoe of
+                     rules.nDecks, as in cards.Deck(nd)); see odds.composition
+        processes -- number of worker processes, one up-card per task
+                     (None runs everything in this process)
+    Returns a dict with the house edge, and the player EV per up-card.
+    """
+    rules = rules if rules is not None else RuleSet()
+    counts = tuple(counts) if counts is not None else odds.fullShoe(rules.nDecks)
+    n = sum(counts)
+
+    ups  = [ up for up in range(1, 11) if counts[up-1] ]
+    args = [ (odds.remove(counts, up), up, rules, action) for up in ups ]
+    if processes:
+        with ProcessPoolExecutor(processes) as pool:
+            evs = list(pool.map(_upcardEV, args))
+    else:
+        evs = list(map(_upcardEV, args))
+
+    byUp = dict(zip(ups, evs))
+    ev = sum(counts[up-1] / n * e for up, e in byUp.items())
+    return { 'houseEdge' : -ev,
+             'ev'        : ev,
+             'byUpcard'  : byUp,
+           }
+
+#------------------------------------------------------------------------------
+#       Main function
+#------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import os
+    pprint.pprint(houseEdge(processes=os.cpu_count()))
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,188 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: holdem.py
+#  Created: 10/19/2026, 17:20
+#   Author: Bernie Roesler
+#
+"""
+  Description: Texas Hold 'Em, on the table game core of casinogame. Every
+  seat antes the minimum bet and gets two hole cards, then either calls one
+  more minimum bet or folds. The five community cards go on the table, and
+  the best hands still in split the pot. The dealer only deals.
+"""
+#==============================================================================
+import numpy as np
+
+import poker
+from casinogame import TableGame, registerGame
+
+#------------------------------------------------------------------------------
+#       Texas Hold 'Em game class
+#------------------------------------------------------------------------------
+@registerGame
+class Holdem(TableGame):
+    """ The logic of a round of Texas Hold 'Em, with one round of betting. """
+    TITLE = "texas hold 'em"
+
+    DEFAULT_NP = 6
+
+    # Decisions
+    CALL = "c"
+    FOLD = "f"
+
+    def __init__(self, nd=1, rng=None):
+        super().__init__(nd, rng)
+        self.folded = []   # whether each seat has folded this round
+
+    #--------------------------------------------------------------------------
+    #        Main Gameplay
+    #--------------------------------------------------------------------------
+    def gameRound(self):
+        self.clearTable()
+        self.checkShoe(0.0)   # fresh deck every round
+
+        ### Ante, and deal the hole cards
+        self.placeBets()
+        self.say("...Dealing the hole cards...")
+        self.table.around(self.deal(ncard=2, faceup=False))
+        for s in self.table.seat:
+            if not s.isEmpty and s.player.isUser:
+                s.player.getFirstHand().turnAllUp()
+
+        ### Call or fold
+        self.folded = [ s.isEmpty or not s.player.n_hands
+                        for s in self.table.seat ]
+        self.aroundQueue(self.callOrFold)
+
+        ### Flop, turn and river
+        for n, street in ((3, "flop"), (1, "turn"), (1, "river")):
+            cs = [ self.deck.dealCard(faceup=True) for i in range(n) ]
+            self.table.cards.extend(cs)
+            self.say("The {}: {}".format(street, ", ".join(map(str, cs))))
+
+        ### Showdown
+        self.say("...Showdown...")
+        self.showdown()
+
+    # Split the pot between the best hands still in
+    def showdown(self):
+        rows = []   # rows in the table's PlayerStore of the seats which bet
+        bets = []
+        best = None
+        winners = []
+        for i, seat in enumerate(self.table.seat):
+            if seat.isEmpty or not seat.player.n_hands:
+                continue
+            h = seat.player.getFirstHand()
+            rows.append(seat.player.row)
+            bets.append(h.bet)
+            h.bet = 0.0
+            if self.folded[i]:
+                continue
+            h.turnAllUp()
+            h.score = self.rank(h)
+            self.say("{} shows {}".format(seat.player.name,
+                                          poker.category(h.score)))
+            if best is None or h.score > best:
+                best = h.score
+                winners = [seat]
+            elif h.score == best:
+                winners.append(seat)
+
+        # The bets leave every seat at once
+        store = self.table.store
+        rows = np.array(rows, dtype=np.intp)
+        bets = np.array(bets, dtype=np.float64)
+        np.subtract.at(store.bet, rows, bets)
+
+        # If every seat folded, nobody takes the pot: the antes go back
+        if not winners:
+            self.say("Everyone folded!")
+            store.credit(rows, bets)
+            return
+
+        share = float(bets.sum()) / len(winners)
+        store.credit(np.array([ s.player.row for s in winners ],
+                              dtype=np.intp), share)
+        for seat in winners:
+            self.say("{} won ${}!".format(seat.player.name, share))
+
+    # Value of the best poker hand of the hole cards and the board
+    def rank(self, h):
+        return poker.evaluate(h.cards + self.table.cards)
+
+    def clearTable(self):
+        super().clearTable()
+        for c in self.table.cards:
+            self.deck.discardCard(c)
+        del self.table.cards[:]
+
+    #--------------------------------------------------------------------------
+    #        Individual Player Methods
+    #--------------------------------------------------------------------------
+    def callOrFold(self, seat):
+        i = self.table.seat.index(seat)
+        if self.folded[i]:
+            return
+        h = seat.player.getFirstHand()
+        choice = self.decide(self.__choose, seat, h,
+                             default=self.__timeoutChoice)
+        if choice == Holdem.CALL and seat.player.placeBet(self.table.minbet):
+            h.bet += self.table.minbet
+            self.say("{}: \"I call.\"".format(seat.player.name))
+        else:
+            self.folded[i] = True
+            self.say("{}: \"I fold.\"".format(seat.player.name))
+
+    # A player who runs out of time folds
+    def __timeoutChoice(self, seat, h):
+        return Holdem.FOLD
+
+    # Choice of a player: computer players follow their policy, else call
+    # with a pair or two high cards
+    def __choose(self, seat, h):
+        if seat.player.policy is not None:
+            return seat.player.policy(self, seat, h)
+        elif __debug__ or not seat.player.isUser:
+            return Holdem.preflop(h)
+        else:
+            return self.__getChoice(seat, h)
+
+    @staticmethod
+    def preflop(h):
+        a, b = (poker.cardRank(c.val) for c in h.cards)
+        if a == b or min(a, b) >= 10:
+            return Holdem.CALL
+        return Holdem.FOLD
+
+    #--------------------------------------------------------------------------
+    #        Interface
+    #--------------------------------------------------------------------------
+    def __getChoice(self, seat, h):
+        print("########## It's your turn! ##########")
+        print("### Your hole cards are:\n{}".format(str(h)))
+        print("### The pot is: ${}".format(sum(float(s.player.bet)
+                                                for s in self.table.seat
+                                                if not s.isEmpty)))
+        self.__handMenu()
+        while True:
+            c = self.ask(self._PROMPT)
+            if c in (Holdem.CALL, Holdem.FOLD):
+                return c
+            if c != "?":
+                print("Invalid input.")
+            self.__handMenu()
+
+    def __handMenu(self):
+        print("---------- Options ----------\n"
+              "  ? -- print this menu\n"
+              "  c -- call (bet the minimum once more, and see the board)\n"
+              "  f -- fold (give up your ante)")
+
+    def gameStatus(self):
+        print("---------- Board:\n{}".format(
+              "\n".join("  " + str(c) for c in self.table.cards)))
+        super().gameStatus()
+
+#==============================================================================
+#==============================================================================
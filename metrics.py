@@ -0,0 +1,261 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: metrics.py
+#  Created: 10/19/2026, 16:02
+#   Author: Bernie Roesler
+#
+"""
+  Description: In-process metrics of a running casino: counters, gauges and
+  histograms kept in a registry, and exported in the Prometheus text format
+  over a local HTTP endpoint.
+
+  Updating a metric is a plain attribute update, without locks, so that it
+  costs next to nothing in the game loop. A scrape reads the values as they
+  are, which may be a few updates behind.
+"""
+#==============================================================================
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#------------------------------------------------------------------------------
+#       Metric values
+#------------------------------------------------------------------------------
+class Counter:
+    """ Value which only goes up. """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, n=1.0):
+        self.value += n
+
+    def samples(self, name, labels):
+        yield name + "_total", labels, self.value
+
+class Gauge:
+    """ Value which goes up and down. """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, x):
+        self.value = x
+
+    def inc(self, n=1.0):
+        self.value += n
+
+    def dec(self, n=1.0):
+        self.value -= n
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+class Histogram:
+    """ Counts of observations in buckets, with their sum.
+    Keyword inputs:
+        buckets -- sorted upper bounds of the buckets (+Inf is implied)
+    Each observation goes in one bucket; the counts are made cumulative on
+    export, as Prometheus expects.
+    """
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.bounds = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, x):
+        self.counts[bisect.bisect_left(self.bounds, x)] += 1
+        self.sum += x
+
+    def samples(self, name, labels):
+        acc = 0
+        for b, c in zip(self.bounds + (math.inf,), self.counts):
+            acc += c
+            yield name + "_bucket", labels + (('le', _fmt(b)),), acc
+        yield name + "_sum", labels, self.sum
+        yield name + "_count", labels, acc
+
+#------------------------------------------------------------------------------
+#       Metric families and the registry
+#------------------------------------------------------------------------------
+class Family:
+    """ A named metric, with one value for each combination of its labels.
+    Keyword inputs:
+        kind   -- one of 'counter', 'gauge', 'histogram'
+        name   -- metric name
+        help   -- one-line description
+        labels -- tuple of label names
+        new    -- procedure of no arguments which creates a value
+    """
+    TYPES = { 'counter'   : Counter,
+              'gauge'     : Gauge,
+              'histogram' : Histogram,
+            }
+
+    def __init__(self, kind, name, help, labels=(), new=None):
+        self.kind   = kind
+        self.name   = name
+        self.help   = help
+        self.labels = tuple(labels)
+        self.new    = new if new is not None else Family.TYPES[kind]
+        self.values = {}   # tuple of label values -> metric value
+        if not self.labels:
+            self.values[()] = self.new()
+
+    # Value for a combination of label values, created on first use
+    def get(self, *values):
+        v = self.values.get(values)
+        if v is None:
+            if len(values) != len(self.labels):
+                raise RuntimeError("Metric {} takes labels {}!"
+                                   .format(self.name, self.labels))
+            v = self.values.setdefault(values, self.new())
+        return v
+
+    # Shortcuts for a family without labels
+    def inc(self, n=1.0):
+        self.values[()].inc(n)
+
+    def set(self, x):
+        self.values[()].set(x)
+
+    def observe(self, x):
+        self.values[()].observe(x)
+
+    # Text exposition of the family. The HELP and TYPE lines must name the
+    # samples, which for a counter carry a _total suffix.
+    def expose(self):
+        name = self.name + "_total" if self.kind == 'counter' else self.name
+        lines = [ "# HELP {} {}".format(name, self.help),
+                  "# TYPE {} {}".format(name, self.kind) ]
+        for values, v in list(self.values.items()):
+            for name, labels, x in v.samples(self.name,
+                                             tuple(zip(self.labels, values))):
+                lines.append(_sample(name, labels, x))
+        return "\n".join(lines)
+
+class Registry:
+    """ Collection of metric families, exported together. """
+
+    def __init__(self):
+        self.families = {}
+
+    def __add(self, family):
+        old = self.families.get(family.name)
+        if old is not None:
+            if (old.kind, old.labels) != (family.kind, family.labels):
+                raise RuntimeError("Metric {} is already registered!"
+                                   .format(family.name))
+            return old
+        self.families[family.name] = family
+        return family
+
+    def counter(self, name, help, labels=()):
+        return self.__add(Family('counter', name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.__add(Family('gauge', name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=None):
+        buckets = tuple(buckets) if buckets is not None else DEFAULT_BUCKETS
+        return self.__add(Family('histogram', name, help, labels,
+                                 new=lambda: Histogram(buckets)))
+
+    # Text exposition format of every metric
+    def expose(self):
+        return "\n".join(f.expose() for f in list(self.families.values())) \
+                + "\n"
+
+# Latency buckets [s], from 100 us to 10 s
+DEFAULT_BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2,
+                   5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _fmt(x):
+    if x == math.inf:
+        return "+Inf"
+    return repr(float(x))
+
+def _sample(name, labels, x):
+    if labels:
+        name += "{" + ",".join('{}="{}"'.format(k, _escape(v))
+                               for k, v in labels) + "}"
+    return "{} {}".format(name, _fmt(x))
+
+def _escape(v):
+    return str(v).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+#------------------------------------------------------------------------------
+#       Metrics of the casino
+#------------------------------------------------------------------------------
+REGISTRY = Registry()
+
+ROUNDS = REGISTRY.counter("casino_rounds",
+            "Rounds played.", ('table',))
+ROUND_SECONDS = REGISTRY.histogram("casino_round_seconds",
+            "Time to play one round.", ('table',))
+DECISIONS = REGISTRY.counter("casino_decisions",
+            "Player decisions, by choice.", ('table', 'choice'))
+RESHUFFLES = REGISTRY.counter("casino_reshuffles",
+            "Shoe reshuffles.", ('table',))
+QUEUE_DEPTH = REGISTRY.gauge("casino_table_queue_depth",
+            "Seats still waiting to play their hands this round.", ('table',))
+SETTLED = REGISTRY.counter("casino_settled_dollars",
+            "Stakes settled with the dealer, by outcome for the player.",
+            ('table', 'outcome'))
+PAID = REGISTRY.counter("casino_paid_dollars",
+            "Winnings paid to players by the dealer.", ('table',))
+DECISION_SECONDS = REGISTRY.histogram("casino_decision_seconds",
+            "Time taken by each seat to make a decision.", ('table', 'seat'))
+TIMEOUTS = REGISTRY.counter("casino_decision_timeouts",
+            "Decisions which ran out of time, and took the default action.",
+            ('table', 'seat'))
+SAVE_SECONDS = REGISTRY.histogram("casino_save_seconds",
+            "Time to save a game to disk.", ('game',))
+
+#------------------------------------------------------------------------------
+#       Export over HTTP
+#------------------------------------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Keep scrapes out of the game's output
+    def log_message(self, *args):
+        pass
+
+def serve(port=9100, host="127.0.0.1", registry=REGISTRY):
+    """ Serve the metrics at http://host:port/metrics from a daemon thread.
+    Port 0 picks a free port. Returns the server; server.server_address has
+    the actual address, and server.shutdown() stops it.
+    """
+    handler = type("Handler", (_Handler,), {'registry' : registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    t = threading.Thread(target=server.serve_forever, daemon=True,
+                         name="metrics")
+    t.start()
+    return server
+
+#------------------------------------------------------------------------------
+#       Main function
+#------------------------------------------------------------------------------
+if __name__ == "__main__":
+    print(REGISTRY.expose(), end="")
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,118 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: odds.py
+#  Created: 10/19/2026, 12:20
+#   Author: Bernie Roesler
+#
+"""
+  Description: Exact blackjack probabilities from the composition of a shoe.
+  A composition is a tuple of 10 counts, of the cards of value 1 (ace)
+  through 10 (tens and faces) left in the shoe.
+"""
+#==============================================================================
+
+# Final dealer outcomes, as indices into an outcome tuple
+OUTCOMES = (17, 18, 19, 20, 21, 'bust')
+BUST = 5
+
+#------------------------------------------------------------------------------
+#       Shoe compositions
+#------------------------------------------------------------------------------
+# Composition of n full decks
+def fullShoe(n=1):
+    return (4*n,)*9 + (16*n,)
+
+# Composition of the cards left in a cards.Deck, from its ShoeIndex
+def composition(deck):
+    ix = deck.index
+    return tuple(ix.rankCount(v) for v in range(1, 10)) \
+            + (ix.total - ix.countAtMost(9),)
+
+# Composition with one card of value v taken out
+def remove(counts, v):
+    if counts[v-1] < 1:
+        raise RuntimeError("No card of value {} left!".format(v))
+    return counts[:v-1] + (counts[v-1] - 1,) + counts[v:]
+
+# Blackjack score of a hand, from its hard total and whether it has an ace
+def score(hard, ace):
+    if ace and hard <= 11:
+        return hard + 10, True
+    return hard, False
+
+#------------------------------------------------------------------------------
+#       Dealer outcomes
+#------------------------------------------------------------------------------
+def dealerOutcomes(counts, up, hitSoft17=False, peek=False, memo=None):
+    """ Probability of each of the dealer's final OUTCOMES, given the
+    composition of the shoe (without the up-card) and the up-card value.
+    Keyword inputs:
+        hitSoft17 -- [boolean] dealer hits soft 17
+        peek      -- [boolean] condition on the dealer not having blackjack,
+                     i.e. after the dealer has peeked at the hole card
+        memo      -- transposition table shared between calls, keyed on the
+                     remaining composition and the dealer's hand
+    """
+    if memo is None:
+        memo = {}
+    # Hole card which would give the dealer a natural
+    skip = 0
+    if peek:
+        skip = 10 if up == 1 else (1 if up == 10 else 0)
+    return _dealer(counts, up, up == 1, hitSoft17, skip, memo)
+
+# Dealer outcomes from a dealer hand of hard total hard (with an ace, if ace)
+def dealerHand(counts, hard, ace, hitSoft17=False, memo=None):
+    if memo is None:
+        memo = {}
+    return _dealer(counts, hard, ace, hitSoft17, 0, memo)
+
+def _dealer(counts, hard, ace, h17, skip, memo):
+    key = (counts, hard, ace, h17, skip)
+    if key in memo:
+        return memo[key]
+
+    s, soft = score(hard, ace)
+    if s > 21:
+        out = (0.0,)*BUST + (1.0,)
+    elif s >= 17 and not (h17 and s == 17 and soft):
+        out = tuple(1.0 if o == s else 0.0 for o in OUTCOMES)
+    else:
+        n = sum(counts) - (counts[skip-1] if skip else 0)
+        acc = [0.0]*len(OUTCOMES)
+        for v in range(1, 11):
+            c = counts[v-1]
+            if c == 0 or v == skip:
+                continue
+            sub = _dealer(remove(counts, v), hard + v, ace or v == 1,
+                          h17, 0, memo)
+            p = c / n
+            for i in range(len(OUTCOMES)):
+                acc[i] += p * sub[i]
+        out = tuple(acc)
+
+    memo[key] = out
+    return out
+
+# EV of standing on score s, per unit bet, against a distribution dist of
+# the dealer's OUTCOMES
+def standEV(s, dist):
+    if s > 21:
+        return -1.0
+    ev = dist[BUST]
+    for i, d in enumerate(OUTCOMES[:BUST]):
+        if s > d:
+            ev += dist[i]
+        elif s < d:
+            ev -= dist[i]
+    return ev
+
+# Table of dealer outcomes for every up-card, dealt from a full shoe
+def dealerTable(nDecks=6, hitSoft17=False, peek=False):
+    shoe = fullShoe(nDecks)
+    memo = {}
+    return { up : dealerOutcomes(remove(shoe, up), up, hitSoft17, peek, memo)
+             for up in range(1, 11) }
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,290 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: poker.py
+#  Created: 10/19/2026, 16:40
+#   Author: Bernie Roesler
+#
+"""
+  Description: Rank poker hands of 5 to 7 cards.
+
+  The fast evaluator works on a compact encoding of each card as an integer
+  code = 4*(rank - 2) + suit, with ranks 2..14 (aces high). The value of a
+  hand is an integer that compares like the hands do. A hand with 5 or more
+  cards of one suit is looked up by the bit mask of the ranks in that suit;
+  any other hand only depends on its multiset of ranks, which is looked up
+  by the product of one prime per rank. Both tables are built at import.
+
+  rank5 and bestRank are the slow reference evaluator, which gives a rank as
+  a tuple of the category of the hand (HIGH_CARD .. STRAIGHT_FLUSH),
+  followed by the ranks of the cards that break ties within the category.
+  pack() turns such a tuple into the value of the fast evaluator.
+"""
+#==============================================================================
+import itertools
+
+import numpy as np
+
+# Hand categories, from worst to best
+HIGH_CARD      = 0
+PAIR           = 1
+TWO_PAIR       = 2
+THREE_OF_KIND  = 3
+STRAIGHT       = 4
+FLUSH          = 5
+FULL_HOUSE     = 6
+FOUR_OF_KIND   = 7
+STRAIGHT_FLUSH = 8
+
+CATEGORY_STR = { HIGH_CARD      : "high card",
+                 PAIR           : "pair",
+                 TWO_PAIR       : "two pair",
+                 THREE_OF_KIND  : "three of a kind",
+                 STRAIGHT       : "straight",
+                 FLUSH          : "flush",
+                 FULL_HOUSE     : "full house",
+                 FOUR_OF_KIND   : "four of a kind",
+                 STRAIGHT_FLUSH : "straight flush",
+               }
+
+# Poker rank of a card value: aces are high
+def cardRank(val):
+    return 14 if val == 1 else val
+
+#------------------------------------------------------------------------------
+#       Ranking hands
+#------------------------------------------------------------------------------
+def rank5(cards):
+    """ Rank of a hand of exactly 5 cards.Card. """
+    ranks = sorted((cardRank(c.val) for c in cards), reverse=True)
+    flush = len(set(c.suit for c in cards)) == 1
+
+    # Group the ranks by count, then by rank: e.g. a full house is (3, 2)
+    counts = {}
+    for r in ranks:
+        counts[r] = counts.get(r, 0) + 1
+    groups = sorted(counts.items(), key=lambda g: (g[1], g[0]), reverse=True)
+    shape = tuple(n for r, n in groups)
+    order = tuple(r for r, n in groups)
+
+    # Straights, with the ace low in the wheel (5-4-3-2-A)
+    straight = None
+    if len(counts) == 5:
+        if ranks[0] - ranks[4] == 4:
+            straight = ranks[0]
+        elif ranks == [14, 5, 4, 3, 2]:
+            straight = 5
+
+    if straight and flush:
+        return (STRAIGHT_FLUSH, straight)
+    if shape == (4, 1):
+        return (FOUR_OF_KIND,) + order
+    if shape == (3, 2):
+        return (FULL_HOUSE,) + order
+    if flush:
+        return (FLUSH,) + tuple(ranks)
+    if straight:
+        return (STRAIGHT, straight)
+    if shape == (3, 1, 1):
+        return (THREE_OF_KIND,) + order
+    if shape == (2, 2, 1):
+        return (TWO_PAIR,) + order
+    if shape == (2, 1, 1, 1):
+        return (PAIR,) + order
+    return (HIGH_CARD,) + tuple(ranks)
+
+def bestRank(cards):
+    """ Rank of the best 5-card hand out of 5 to 7 cards. """
+    return max(rank5(h) for h in itertools.combinations(cards, 5))
+
+# Integer value of a rank tuple: 4 bits per entry, category first
+def pack(rank):
+    v = 0
+    for x in (rank + (0,)*6)[:6]:
+        v = (v << 4) | x
+    return v
+
+#------------------------------------------------------------------------------
+#       Lookup tables
+#------------------------------------------------------------------------------
+N_RANKS = 13
+PRIMES  = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)   # one per rank
+
+# Properties of each of the 52 card codes: the prime of its rank, and its
+# rank bit in a 52-bit mask that keeps 13 bits for each suit
+PRIME = tuple(PRIMES[c >> 2] for c in range(52))
+BIT   = tuple(1 << (N_RANKS*(c & 3) + (c >> 2)) for c in range(52))
+SUIT_MASK = (1 << N_RANKS) - 1
+
+# Code of each cards.Card, indexed as CODE[val][suit]
+CODE = [[ 4*(cardRank(val) - 2) + suit if val else None for suit in range(4) ]
+        for val in range(14) ]
+
+def encode(card):
+    return CODE[card.val][card.suit]
+
+# High card of the best straight in a mask of rank bits, else 0
+def _straight(mask):
+    for hi in range(N_RANKS - 1, 3, -1):
+        run = 0b11111 << (hi - 4)
+        if mask & run == run:
+            return hi + 2
+    wheel = (1 << 12) | 0b1111   # A-2-3-4-5
+    return 5 if mask & wheel == wheel else 0
+
+# Ranks (2..14) of the bits of a mask, highest first
+def _ranks(mask):
+    return [ r + 2 for r in range(N_RANKS - 1, -1, -1) if mask >> r & 1 ]
+
+# Value of the best hand in one suit, from its mask of 5 or more ranks
+def _flushValue(mask):
+    hi = _straight(mask)
+    if hi:
+        return pack((STRAIGHT_FLUSH, hi))
+    return pack((FLUSH,) + tuple(_ranks(mask)[:5]))
+
+# Value of the best hand without a flush, from the count of each rank
+def _plainValue(counts):
+    mask = 0
+    present = []                  # ranks (2..14) in the hand, highest first
+    by = ([], [], [], [], [])     # the same, by their count
+    for r in range(N_RANKS - 1, -1, -1):
+        n = counts[r]
+        if n:
+            mask |= 1 << r
+            present.append(r + 2)
+            by[n].append(r + 2)
+    quads, trips, pairs = by[4], by[3], by[2]
+
+    def kickers(used, k):
+        return tuple(r for r in present if r not in used)[:k]
+
+    if quads:
+        return pack((FOUR_OF_KIND, quads[0]) + kickers(quads[:1], 1))
+    if trips and (len(trips) > 1 or pairs):
+        pair = max(trips[1:] + pairs)
+        return pack((FULL_HOUSE, trips[0], pair))
+    hi = _straight(mask)
+    if hi:
+        return pack((STRAIGHT, hi))
+    if trips:
+        return pack((THREE_OF_KIND, trips[0]) + kickers(trips, 2))
+    if len(pairs) > 1:
+        return pack((TWO_PAIR,) + tuple(pairs[:2]) + kickers(pairs[:2], 1))
+    if pairs:
+        return pack((PAIR, pairs[0]) + kickers(pairs, 3))
+    return pack((HIGH_CARD,) + kickers((), 5))
+
+def _buildTables():
+    flush = [0] * (1 << N_RANKS)
+    for mask in range(1 << N_RANKS):
+        if bin(mask).count("1") >= 5:
+            flush[mask] = _flushValue(mask)
+
+    plain = {}
+    for n in (5, 6, 7):
+        for hand in itertools.combinations_with_replacement(range(N_RANKS), n):
+            counts = [0] * N_RANKS
+            p = 1
+            for r in hand:
+                counts[r] += 1
+                p *= PRIMES[r]
+            if max(counts) <= 4:
+                plain[p] = _plainValue(counts)
+    return flush, plain
+
+# FLUSH_TABLE[mask of ranks in one suit],
+# PLAIN_TABLE[product of the primes of the ranks]
+FLUSH_TABLE, PLAIN_TABLE = _buildTables()
+
+# The same tables as arrays, for batches
+FLUSH_A = np.array(FLUSH_TABLE, dtype=np.int64)
+PLAIN_KEYS = np.array(sorted(PLAIN_TABLE), dtype=np.int64)
+PLAIN_VALS = np.array([ PLAIN_TABLE[k] for k in PLAIN_KEYS.tolist() ],
+                      dtype=np.int64)
+PRIME_A = np.array(PRIME, dtype=np.int64)
+BIT_A   = np.array(BIT, dtype=np.int64)
+
+#------------------------------------------------------------------------------
+#       Fast evaluation
+#------------------------------------------------------------------------------
+def evaluateCodes(codes):
+    """ Value of the best hand out of 5 to 7 card codes. """
+    p = 1
+    m = 0
+    for c in codes:
+        p *= PRIME[c]
+        m |= BIT[c]
+    # A flush beats any hand that 7 cards with a flush could also make
+    return FLUSH_TABLE[m & SUIT_MASK] \
+            or FLUSH_TABLE[m >> 13 & SUIT_MASK] \
+            or FLUSH_TABLE[m >> 26 & SUIT_MASK] \
+            or FLUSH_TABLE[m >> 39] \
+            or PLAIN_TABLE[p]
+
+def evaluate(cards):
+    """ Value of the best hand out of 5 to 7 cards.Card. """
+    return evaluateCodes([ CODE[c.val][c.suit] for c in cards ])
+
+def evaluateBatch(codes):
+    """ Values of many hands at once.
+    Keyword inputs:
+        codes -- integer array of shape (n, k), with 5 <= k <= 7: one hand
+                 of card codes per row
+    Returns an int64 array of n values.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    prod = PRIME_A[codes].prod(axis=1)
+    vals = PLAIN_VALS[np.searchsorted(PLAIN_KEYS, prod)]
+    m = BIT_A[codes].sum(axis=1)   # the bits of the cards are distinct
+    for s in range(4):
+        fl = FLUSH_A[(m >> N_RANKS*s) & SUIT_MASK]
+        vals = np.where(fl > 0, fl, vals)
+    return vals
+
+def category(value):
+    """ Name of the category of a hand value, e.g. "full house". """
+    return CATEGORY_STR[value >> 20]
+
+#------------------------------------------------------------------------------
+#       Monte Carlo equity
+#------------------------------------------------------------------------------
+def equity(hole, board=(), nOpponents=1, trials=10000, rng=None):
+    """ Share of the pot won by a hand against random opponents' hands, by
+    Monte Carlo over the unseen cards.
+    Keyword inputs:
+        hole       -- the player's two cards.Card
+        board      -- community cards.Card dealt so far (0 to 5)
+        nOpponents -- number of opponents still in the hand
+        trials     -- number of random deals
+        rng        -- numpy Generator (default: a fresh one)
+    Ties split the pot between the tied hands.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    known = [ encode(c) for c in list(hole) + list(board) ]
+    rest = np.array(sorted(set(range(52)) - set(known)), dtype=np.int64)
+    nBoard = 5 - len(board)
+    need = nBoard + 2*nOpponents
+
+    # Draw the unseen cards of every trial without replacement
+    order = rng.random((trials, len(rest))).argsort(axis=1)[:, :need]
+    drawn = rest[order]
+    common = np.hstack([ np.tile(np.array([ encode(c) for c in board ],
+                                          dtype=np.int64), (trials, 1)),
+                         drawn[:, :nBoard] ])
+
+    holeCodes = np.tile(np.array(known[:2], dtype=np.int64), (trials, 1))
+    mine = evaluateBatch(np.hstack([ holeCodes, common ]))
+    best = np.zeros(trials, dtype=np.int64)
+    nBest = np.zeros(trials, dtype=np.int64)
+    for k in range(nOpponents):
+        theirs = drawn[:, nBoard + 2*k : nBoard + 2*k + 2]
+        v = evaluateBatch(np.hstack([ theirs, common ]))
+        nBest = np.where(v > best, 1, np.where(v == best, nBest + 1, nBest))
+        best = np.maximum(best, v)
+
+    share = np.where(mine > best, 1.0,
+                     np.where(mine == best, 1.0 / (nBest + 1), 0.0))
+    return float(share.mean())
+
+#==============================================================================
+#==============================================================================
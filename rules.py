@@ -0,0 +1,69 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: rules.py
+#  Created: 10/19/2026, 11:30
+#   Author: Bernie Roesler
+#
+"""
+  Description: Rule variants of a blackjack table.
+"""
+#==============================================================================
+import pprint
+
+#------------------------------------------------------------------------------
+#       Set of table rules
+#------------------------------------------------------------------------------
+class RuleSet:
+    """ Rules of a blackjack table.
+    Keyword inputs:
+        nDecks           -- number of decks in the shoe
+        hitSoft17        -- [boolean] dealer hits soft 17 (H17), else S17
+        doubleAfterSplit -- [boolean] doubling allowed on split hands (DAS)
+        surrender        -- [boolean] late surrender allowed
+        bjPayout         -- payout of a natural blackjack, per unit bet
+        penetration      -- fraction of the shoe dealt before a reshuffle
+                            (0 reshuffles before every round)
+        maxHands         -- maximum number of hands per player after splits
+    """
+
+    def __init__(self, nDecks=6, hitSoft17=False, doubleAfterSplit=True,
+                 surrender=True, bjPayout=1.5, penetration=0.75, maxHands=4):
+        self.nDecks           = int(nDecks)
+        self.hitSoft17        = bool(hitSoft17)
+        self.doubleAfterSplit = bool(doubleAfterSplit)
+        self.surrender        = bool(surrender)
+        self.bjPayout         = float(bjPayout)
+        self.penetration      = float(penetration)
+        self.maxHands         = int(maxHands)
+
+    # Rules as a tuple, so rule sets can be compared and used as keys
+    def key(self):
+        return (self.nDecks, self.hitSoft17, self.doubleAfterSplit,
+                self.surrender, self.bjPayout, self.penetration, self.maxHands)
+
+    # Short description, i.e. "6D S17 DAS LS 3:2 75%"
+    def label(self):
+        pay = {1.5 : "3:2", 1.2 : "6:5", 1.0 : "1:1"}
+        return " ".join(filter(None, [
+            "{}D".format(self.nDecks),
+            "H17" if self.hitSoft17 else "S17",
+            "DAS" if self.doubleAfterSplit else "",
+            "LS" if self.surrender else "",
+            pay.get(self.bjPayout, "{:g}:1".format(self.bjPayout)),
+            "{:.0%}".format(self.penetration),
+            ]))
+
+    def __eq__(self, b):
+        return self.key() == b.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __str__(self):
+        return pprint.pformat(self.__dict__)
+
+    def __repr__(self):
+        return "RuleSet({})".format(self.label())
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,198 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: sessionlog.py
+#  Created: 10/19/2026, 15:10
+#   Author: Bernie Roesler
+#
+"""
+  Description: Compact binary log of a game session, and a tool to replay
+  any round of it. The log holds the seed and rules of the session, the
+  stream of player decisions of every round, and a pickled checkpoint of the
+  game every so many rounds. A round is replayed headless from the nearest
+  checkpoint before it, using the logged decisions.
+
+  Usage: python sessionlog.py LOGFILE ROUND
+"""
+#==============================================================================
+import argparse
+import pickle
+import pprint
+import struct
+
+#------------------------------------------------------------------------------
+#       File format
+#------------------------------------------------------------------------------
+# File starts with MAGIC, followed by records. Each record has a header of
+# (kind, round number, payload length), followed by the payload:
+#   HEADER     -- pickled dict of the session (seed, rules, ...)
+#   CHECKPOINT -- pickled game, at the start of the round
+#   ROUND      -- decisions made during the round, one byte each
+MAGIC      = b"CSLG\x01"
+RECORD     = struct.Struct("<cII")
+HEADER     = b"H"
+CHECKPOINT = b"C"
+ROUND      = b"R"
+
+#------------------------------------------------------------------------------
+#       Writing a session
+#------------------------------------------------------------------------------
+class SessionLog:
+    """ Records a game session to a file.
+    Keyword inputs:
+        path  -- file to write
+        game  -- CasinoGame to record (the log attaches itself to it)
+        seed  -- seed of the session, for reference
+        every -- number of rounds between checkpoints
+    """
+    DEFAULT_EVERY = 1000
+
+    def __init__(self, path, game, seed=None, every=DEFAULT_EVERY):
+        self.every = every
+        self.buf = bytearray()   # decisions of the current round
+        self.checkpointed = False   # whether any checkpoint is written yet
+        self.fp = open(path, "wb")
+        self.fp.write(MAGIC)
+        head = { 'name'  : game.name,
+                 'seed'  : seed,
+                 'rules' : getattr(game, 'rules', None),
+                 'every' : every,
+                 'start' : game.rounds,
+               }
+        self.__write(HEADER, game.rounds, pickle.dumps(head))
+        game.log = self
+
+    def __write(self, kind, n, payload):
+        self.fp.write(RECORD.pack(kind, n, len(payload)))
+        self.fp.write(payload)
+
+    # Called by the game around every round. The first round logged always
+    # gets a checkpoint, so that a log attached to a game which has already
+    # played some rounds can be replayed from its start.
+    def beginRound(self, game):
+        del self.buf[:]
+        if not self.checkpointed or game.rounds % self.every == 0:
+            self.__write(CHECKPOINT, game.rounds, pickle.dumps(game))
+            self.checkpointed = True
+
+    def decision(self, choice):
+        self.buf += choice.encode("ascii")
+
+    def endRound(self, game):
+        # game.rounds has already counted this round
+        self.__write(ROUND, game.rounds - 1, bytes(self.buf))
+
+    def close(self):
+        self.fp.close()
+
+#------------------------------------------------------------------------------
+#       Replaying a session
+#------------------------------------------------------------------------------
+class DecisionFeed:
+    """ Feeds the logged decisions of one round back to the game. """
+
+    def __init__(self, data):
+        self.data = data
+        self.i = 0
+
+    def next(self):
+        if self.i >= len(self.data):
+            raise RuntimeError("Replay ran out of logged decisions!")
+        c = chr(self.data[self.i])
+        self.i += 1
+        return c
+
+class Replay:
+    """ Index of a session log, to rebuild the game at any round.
+    Keyword inputs:
+        path -- log file written by SessionLog
+    Only record headers are read to build the index; payloads are read on
+    demand.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.head = None
+        self.checkpoints = []   # sorted list of (round, offset, length)
+        self.rounds = {}        # round -> (offset, length)
+        with open(path, "rb") as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise RuntimeError("Not a session log: {}".format(path))
+            while True:
+                rec = fp.read(RECORD.size)
+                if len(rec) < RECORD.size:
+                    break
+                kind, n, length = RECORD.unpack(rec)
+                offset = fp.tell()
+                if kind == HEADER:
+                    self.head = pickle.loads(fp.read(length))
+                    continue
+                if kind == CHECKPOINT:
+                    self.checkpoints.append((n, offset, length))
+                elif kind == ROUND:
+                    self.rounds[n] = (offset, length)
+                fp.seek(length, 1)
+
+    def __read(self, offset, length):
+        with open(self.path, "rb") as fp:
+            fp.seek(offset)
+            return fp.read(length)
+
+    def decisions(self, n):
+        if n not in self.rounds:
+            raise RuntimeError("Round {} is not in the log!".format(n))
+        return self.__read(*self.rounds[n])
+
+    def seek(self, n):
+        """ Game as it was at the start of round n: load the nearest
+        checkpoint, and re-play the rounds since then headless.
+        """
+        before = [ c for c in self.checkpoints if c[0] <= n ]
+        if not before:
+            raise RuntimeError("No checkpoint before round {}!".format(n))
+        k, offset, length = before[-1]
+        game = pickle.loads(self.__read(offset, length))
+        verbose = game.verbose
+        game.verbose = False
+        for r in range(k, n):
+            self.__replayRound(game, r)
+        game.verbose = verbose
+        return game
+
+    # Play round n of the game, fed with its logged decisions
+    def playRound(self, game, n):
+        self.__replayRound(game, n)
+        return game
+
+    def __replayRound(self, game, n):
+        game.replay = DecisionFeed(self.decisions(n))
+        try:
+            game.playRound()
+        finally:
+            game.replay = None
+
+    def __str__(self):
+        return pprint.pformat({ 'head'        : self.head,
+                                'checkpoints' : len(self.checkpoints),
+                                'rounds'      : len(self.rounds) })
+
+    def __repr__(self):
+        return self.__str__()
+
+#------------------------------------------------------------------------------
+#       Main function
+#------------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a round of a "
+                                     "logged casino session.")
+    parser.add_argument("log", help="session log file")
+    parser.add_argument("round", type=int, help="round number to replay")
+    args = parser.parse_args()
+
+    rp = Replay(args.log)
+    g = rp.seek(args.round)
+    g.verbose = True
+    rp.playRound(g, args.round)
+    g.gameStatus()
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,215 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: simulate.py
+#  Created: 10/19/2026, 10:05
+#   Author: Bernie Roesler
+#
+"""
+  Description: Drive headless rounds of a casino game to estimate the
+  expected result per round, stopping as soon as the estimate is precise
+  enough or the time budget runs out.
+"""
+#==============================================================================
+import copy
+import math
+import pprint
+import time
+
+import casinogame
+from analytics import RunningStats
+from cards import ShoeCache
+from rules import RuleSet
+
+#------------------------------------------------------------------------------
+#       Early-stopping simulation
+#------------------------------------------------------------------------------
+class Simulation:
+    """ Play rounds of a game in batches, keeping a running standard error of
+    the mean result per round.
+    Keyword inputs:
+        game  -- a CasinoGame with its table set up (i.e. after botInit)
+        batch -- number of rounds between checks of the stopping rules
+        z     -- z-score of the confidence interval (1.96 ~ 95%)
+    The result of a round is the average net result over the seats that
+    played it, in units of the table minimum bet, so rounds are independent
+    samples and -mean is the house edge per hand.
+    """
+    DEFAULT_BATCH = 1000
+    MIN_ROUNDS    = 100   # don't trust the standard error before this
+
+    def __init__(self, game, batch=DEFAULT_BATCH, z=1.96):
+        self.game  = game
+        self.batch = batch
+        self.z     = z
+        self.stats = RunningStats()
+        self.game.verbose = False
+
+    # Half-width of the confidence interval on the mean
+    @property
+    def halfwidth(self):
+        return self.z * self.stats.stderr
+
+    # Play one round, and push its result
+    def step(self):
+        self.game.playRound()
+        res = self.game.roundResults()
+        if not res:
+            return False
+        unit = self.game.table.minbet
+        self.stats.push(sum(r[1] for r in res) / (unit * len(res)))
+        return True
+
+    def run(self, halfwidth=None, maxRounds=None, wallTime=None, cpuTime=None,
+            progress=None):
+        """ Play rounds until one of the stopping rules is met:
+            halfwidth -- target half-width of the confidence interval
+            maxRounds -- total number of rounds
+            wallTime  -- [s] wall-clock budget
+            cpuTime   -- [s] CPU budget of this process
+        progress, if given, is called with the summary dict after every batch.
+        Returns a summary dict, with the rule that stopped the run as 'stop'.
+        """
+        if (halfwidth, maxRounds, wallTime, cpuTime) == (None,)*4:
+            raise RuntimeError("Simulation needs at least one stopping rule!")
+
+        wall0 = time.monotonic()
+        cpu0  = time.process_time()
+        stop  = None
+        while stop is None:
+            for i in range(self.batch):
+                if maxRounds is not None and self.stats.n >= maxRounds:
+                    break
+                if not self.step():
+                    stop = 'empty'   # every seat is out of money
+                    break
+
+            if stop is not None:
+                break
+            if progress is not None:
+                progress(self.summary(wall=time.monotonic() - wall0,
+                                      cpu=time.process_time() - cpu0))
+            if (halfwidth is not None) and (self.stats.n >= Simulation.MIN_ROUNDS) \
+                    and (self.halfwidth <= halfwidth):
+                stop = 'halfwidth'
+            elif maxRounds is not None and self.stats.n >= maxRounds:
+                stop = 'rounds'
+            elif wallTime is not None and time.monotonic() - wall0 >= wallTime:
+                stop = 'wallTime'
+            elif cpuTime is not None and time.process_time() - cpu0 >= cpuTime:
+                stop = 'cpuTime'
+
+        return self.summary(stop,
+                            wall=time.monotonic() - wall0,
+                            cpu=time.process_time() - cpu0)
+
+    def summary(self, stop=None, wall=0.0, cpu=0.0):
+        hw = self.halfwidth if self.stats.n > 1 else math.inf
+        return { 'stop'      : stop,
+                 'rounds'    : self.stats.n,
+                 'mean'      : self.stats.mean,
+                 'stderr'    : self.stats.stderr,
+                 'halfwidth' : hw,
+                 'wall'      : wall,
+                 'cpu'       : cpu,
+               }
+
+    def __str__(self):
+        return pprint.pformat(self.summary())
+
+    def __repr__(self):
+        return self.__str__()
+
+#------------------------------------------------------------------------------
+#       Paired simulation with common random numbers
+#------------------------------------------------------------------------------
+class PairedSimulation(Simulation):
+    """ Play several policies or bet spreads in lockstep on the identical
+    sequence of shoes, and estimate the difference of each from the first
+    (the baseline).
+    Keyword inputs:
+        policies -- dict of name -> policy (see strategy.py), or of name ->
+                    (policy, sizer) to compare bet spreads as well (see
+                    betting.py); the first one is the baseline
+        rules    -- RuleSet of every table
+        seed     -- seed of the shoe sequence
+        np, m    -- number of seats and minimum bet of every table
+        money    -- bankroll of each player (i.e. for betting.Kelly)
+        betting  -- bet sizer of the arms which don't give their own
+        batch, z -- as for Simulation
+    Every table deals the same k-th shoe after its k-th reshuffle, and the
+    tables move to the next shoe together, as soon as any of them is dealt
+    past the penetration. The count is then the same at every table at the
+    start of each shoe, so the shuffle noise mostly cancels out of the
+    paired differences. The stopping rule on halfwidth applies to the widest
+    confidence interval of the differences.
+    """
+
+    def __init__(self, policies, rules=None, seed=0, np=5, m=10, money=1e12,
+                 betting=None, batch=Simulation.DEFAULT_BATCH, z=1.96):
+        rules = rules if rules is not None else RuleSet()
+        shoes = ShoeCache(rules.nDecks, seed)
+        self.penetration = rules.penetration
+
+        self.names = list(policies)
+        self.games = []
+        for name in self.names:
+            arm = policies[name]
+            policy, sizer = arm if isinstance(arm, tuple) else (arm, betting)
+            g = casinogame.Blackjack(rules=rules, rng=shoes.cursor())
+            # Sizers may keep state per player, so each table gets its own
+            g.botInit(np, m, money=money, policy=policy,
+                      betting=copy.deepcopy(sizer))
+            g.verbose = False
+            self.games.append(g)
+
+        self.batch = batch
+        self.z     = z
+        self.each  = { name : RunningStats() for name in self.names }
+        self.diff  = { name : RunningStats() for name in self.names[1:] }
+        self.stats = self.each[self.names[0]]   # counts rounds for run()
+
+    # Move every table to its next shoe at once, if any of them is due
+    def syncShoes(self):
+        if any(g.deck.dealtFraction() >= self.penetration
+               for g in self.games):
+            for g in self.games:
+                g.clearTable()
+                g.checkShoe(0.0)
+
+    @property
+    def halfwidth(self):
+        if not self.diff:
+            return self.z * self.stats.stderr
+        return self.z * max(d.stderr for d in self.diff.values())
+
+    # Play one round at every table, and push the paired differences
+    def step(self):
+        self.syncShoes()
+        means = []
+        for g in self.games:
+            g.playRound()
+            res = g.roundResults()
+            if not res:
+                return False
+            means.append(sum(r[1] for r in res) / (g.table.minbet * len(res)))
+
+        base = means[0]
+        for name, x in zip(self.names, means):
+            self.each[name].push(x)
+        for name, x in zip(self.names[1:], means[1:]):
+            self.diff[name].push(x - base)
+        return True
+
+    def summary(self, stop=None, wall=0.0, cpu=0.0):
+        res = super().summary(stop, wall, cpu)
+        res['baseline'] = self.names[0]
+        res['mean'] = { k : v.mean for k, v in self.each.items() }
+        res['stderr'] = { k : v.stderr for k, v in self.each.items() }
+        res['diff'] = { k : { 'mean'      : v.mean,
+                              'stderr'    : v.stderr,
+                              'halfwidth' : self.z * v.stderr,
+                            } for k, v in self.diff.items() }
+        return res
+
+#==============================================================================
+#==============================================================================
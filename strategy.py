@@ -0,0 +1,126 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: strategy.py
+#  Created: 10/19/2026, 11:52
+#   Author: Bernie Roesler
+#
+"""
+  Description: Playing policies for computer blackjack players. A policy is
+  called as policy(game, seat, hand), and returns one of the choices of the
+  hand menu ('h', 's', 'd', 'x', 'p').
+
+  When the dealer shows an ace, the game also asks whether to take insurance
+  with policy.insure(game, seat, hand), which returns 'i' or 'n'. A policy
+  without an insure attribute uses insurance() below.
+"""
+#==============================================================================
+
+#------------------------------------------------------------------------------
+#       Basic strategy tables (multi-deck, S17, DAS, late surrender)
+#------------------------------------------------------------------------------
+# Each string has one action per dealer up-card: 2 3 4 5 6 7 8 9 T A
+#   H -- hit
+#   S -- stand
+#   D -- double if allowed, else hit
+#   d -- double if allowed, else stand
+#   R -- surrender if allowed, else hit
+#   P -- split
+_HARD = { 8  : "HHHHHHHHHH",
+          9  : "HDDDDHHHHH",
+          10 : "DDDDDDDDHH",
+          11 : "DDDDDDDDDH",
+          12 : "HHSSSHHHHH",
+          13 : "SSSSSHHHHH",
+          14 : "SSSSSHHHHH",
+          15 : "SSSSSHHHRH",
+          16 : "SSSSSHHRRR",
+          17 : "SSSSSSSSSS",
+        }
+
+_SOFT = { 13 : "HHHDDHHHHH",
+          14 : "HHHDDHHHHH",
+          15 : "HHDDDHHHHH",
+          16 : "HHDDDHHHHH",
+          17 : "HDDDDHHHHH",
+          18 : "SddddSSHHH",
+          19 : "SSSSSSSSSS",
+        }
+
+# Pairs by card value (ace == 1); pairs not listed are played as totals
+_PAIR = { 1 : "PPPPPPPPPP",
+          2 : "PPPPPPHHHH",
+          3 : "PPPPPPHHHH",
+          4 : "HHHPPHHHHH",
+          6 : "PPPPPHHHHH",
+          7 : "PPPPPPHHHH",
+          8 : "PPPPPPPPPP",
+          9 : "PPPPPSPPSS",
+        }
+
+# Column of the tables for a dealer up-card (ace == 1)
+def _col(up):
+    return 9 if up == 1 else up - 2
+
+def basicAction(total, soft, pair, up,
+                canDouble=True, canSplit=True, canSurrender=True):
+    """ Basic strategy choice for a hand.
+    Keyword inputs:
+        total -- blackjack score of the hand
+        soft  -- [boolean] whether total counts an ace as 11
+        pair  -- card value of a pair (ace == 1), or 0 if not a pair
+        up    -- value of the dealer's up-card (ace == 1, faces == 10)
+    """
+    c = _col(up)
+    if pair and canSplit and pair in _PAIR and _PAIR[pair][c] == 'P':
+        return 'p'
+
+    if soft:
+        a = _SOFT[min(max(total, 13), 19)][c]
+    else:
+        a = _HARD[min(max(total, 8), 17)][c]
+
+    if a == 'S':
+        return 's'
+    if a == 'H':
+        return 'h'
+    if a == 'D':
+        return 'd' if canDouble else 'h'
+    if a == 'd':
+        return 'd' if canDouble else 's'
+    if a == 'R':
+        return 'x' if canSurrender else 'h'
+
+#------------------------------------------------------------------------------
+#       Policies
+#------------------------------------------------------------------------------
+# Never take a card
+def stand(game, seat, hand):
+    return 's'
+
+# Play like the dealer: hit until 17 or higher
+def mimicDealer(game, seat, hand):
+    return 'h' if hand.score < 17 else 's'
+
+def basicStrategy(game, seat, hand):
+    canSplit = game.canSplit(seat, hand)
+    pair = min(hand.cards[0].val, 10) if canSplit else 0
+    return basicAction(hand.score, hand.soft, pair, game.upCard(),
+                       canDouble=game.canDouble(seat, hand),
+                       canSplit=canSplit,
+                       canSurrender=game.canSurrender(seat, hand))
+
+# Insure when the bet has a positive expectation, from the ten-density of
+# the cards not yet seen (see Blackjack.insuranceEV). Off the top of the
+# shoe it doesn't, so this is the "never insure" of basic strategy until
+# the count is high.
+def insurance(game, seat, hand):
+    return 'i' if game.insuranceEV() > 0 else 'n'
+
+# Policies by name, i.e. for configuration files
+POLICIES = { 'stand'       : stand,
+             'mimicDealer' : mimicDealer,
+             'basic'       : basicStrategy,
+           }
+
+#==============================================================================
+#==============================================================================
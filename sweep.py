@@ -0,0 +1,129 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: sweep.py
+#  Created: 10/19/2026, 12:41
+#   Author: Bernie Roesler
+#
+"""
+  Description: Evaluate a grid of blackjack rule sets x playing policies.
+  Every grid point with the same number of decks is dealt the same sequence
+  of pre-shuffled shoes (common random numbers). Dealer outcome tables are
+  computed once per (decks, H17) and shared: each grid point settles its
+  hands at their expected value against the dealer's up-card from the
+  table, rather than playing out the dealer's hand.
+"""
+#==============================================================================
+import pprint
+
+import casinogame
+import odds
+from cards import ShoeCache
+from simulate import Simulation
+
+#------------------------------------------------------------------------------
+#       Blackjack settled against a dealer outcome table
+#------------------------------------------------------------------------------
+class TableBlackjack(casinogame.Blackjack):
+    """ Blackjack which doesn't play the dealer's hand. Once the dealer has
+    peeked (and has no blackjack), each hand is settled at its expected
+    value against the up-card, from a table of dealer outcomes (see
+    odds.dealerTable with peek=True).
+    Keyword inputs:
+        table -- dealer outcome table, by up-card
+    The table is for a full shoe, so this ignores the effect of the cards
+    already dealt on the dealer's draws. In exchange, the dealer's draws add
+    no variance to the result of a round.
+    """
+
+    def __init__(self, table, rules=None, rng=None):
+        super().__init__(rules=rules, rng=rng)
+        self.dealerOdds = table
+
+    def dealerPlay(self):
+        pass
+
+    def settleBets(self):
+        if self.hasBlackjack(self.dealer):
+            super().settleBets()
+            return
+        dist = self.dealerOdds[self.upCard()]
+        stakes = []
+        for seat in self.table.seat:
+            if not seat.isEmpty:
+                for h in seat.player.hand:
+                    if h.bet == 0: # surrendered, already settled
+                        continue
+                    if self.isNatural(seat, h):
+                        ev = self.rules.bjPayout
+                    else:
+                        ev = odds.standEV(h.score, dist)
+                    # Returns the stake plus ev per unit staked
+                    stakes.append((seat, h.bet, (1 + ev)*h.bet))
+                    h.bet = 0.0
+        self.settleStakes(stakes)
+
+#------------------------------------------------------------------------------
+#       Grid of rule sets x policies
+#------------------------------------------------------------------------------
+class Sweep:
+    """ Evaluate every rule set against every policy.
+    Keyword inputs:
+        rulesets -- list of rules.RuleSet
+        policies -- dict of name -> policy (see strategy.py)
+        rounds   -- number of rounds at each grid point
+        seed     -- seed of the shoe sequences
+        np       -- number of seats at each table
+        m        -- minimum bet
+        dealerOdds -- [boolean] settle hands against the shared dealer
+                      outcome tables (see TableBlackjack), else play out
+                      every dealer hand
+    """
+
+    def __init__(self, rulesets, policies, rounds=10000, seed=0, np=5, m=10,
+                 dealerOdds=True):
+        self.rulesets = rulesets
+        self.policies = policies
+        self.rounds   = rounds
+        self.seed     = seed
+        self.np       = np
+        self.m        = m
+        self.dealerOdds = dealerOdds
+        self.shoes    = {}   # nDecks -> ShoeCache
+        self.tables   = {}   # (nDecks, hitSoft17) -> dealer outcome table
+
+    def shoeCache(self, nDecks):
+        if nDecks not in self.shoes:
+            self.shoes[nDecks] = ShoeCache(nDecks, self.seed)
+        return self.shoes[nDecks]
+
+    def dealerTable(self, rules):
+        key = (rules.nDecks, rules.hitSoft17)
+        if key not in self.tables:
+            self.tables[key] = odds.dealerTable(*key, peek=True)
+        return self.tables[key]
+
+    # Play one grid point
+    def point(self, rules, name):
+        cursor = self.shoeCache(rules.nDecks).cursor()
+        if self.dealerOdds:
+            g = TableBlackjack(self.dealerTable(rules), rules=rules, rng=cursor)
+        else:
+            g = casinogame.Blackjack(rules=rules, rng=cursor)
+        g.botInit(self.np, self.m, money=1e12, policy=self.policies[name])
+        res = Simulation(g).run(maxRounds=self.rounds)
+        res['rules']  = rules.label()
+        res['policy'] = name
+        return res
+
+    def run(self):
+        return [ self.point(rules, name)
+                 for rules in self.rulesets for name in self.policies ]
+
+    def __str__(self):
+        return pprint.pformat(self.__dict__)
+
+    def __repr__(self):
+        return self.__str__()
+
+#==============================================================================
+#==============================================================================
@@ -0,0 +1,87 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: test_deadline.py
+#  Created: 10/19/2026, 20:40
+#   Author: Bernie Roesler
+#
+"""
+  Description: Tests of per-decision deadlines: a player who takes too long,
+  computer or human, gets the default action by the deadline, and the table
+  moves on. Run with pytest.
+"""
+#==============================================================================
+import random
+import time
+
+import pytest
+
+# The game needs the names and my_util helpers
+pytest.importorskip("names")
+pytest.importorskip("my_util")
+
+import casinogame
+import metrics
+import strategy
+
+DEADLINE = 0.05   # [s]
+SLEEP    = 0.3    # [s] time a slow policy takes per decision
+SLACK    = 0.1    # [s] allowance for scheduling, per decision
+
+# Basic strategy, after a long think
+def sleepy(game, seat, hand):
+    time.sleep(SLEEP)
+    return strategy.basicStrategy(game, seat, hand)
+
+def newGame(policy, nPlayers=3):
+    g = casinogame.Blackjack(rng=random.Random(0))
+    g.botInit(nPlayers, 10, money=1e6, policy=policy)
+    g.verbose = False
+    g.deadline = DEADLINE
+    return g
+
+#------------------------------------------------------------------------------
+#       Tests
+#------------------------------------------------------------------------------
+def test_slow_choice_gets_default():
+    g = newGame(strategy.basicStrategy, 1)
+    seat = g.table.seat[0]
+    t0 = time.perf_counter()
+    c = g.decide(lambda seat: time.sleep(SLEEP) or 'h', seat,
+                 default=lambda seat: 's')
+    assert c == 's'
+    assert time.perf_counter() - t0 < DEADLINE + SLACK
+
+def test_fast_choice_is_kept():
+    g = newGame(strategy.basicStrategy, 1)
+    seat = g.table.seat[0]
+    assert g.decide(lambda seat: 'h', seat, default=lambda seat: 's') == 'h'
+
+def test_error_in_decision_is_raised():
+    g = newGame(strategy.basicStrategy, 1)
+    seat = g.table.seat[0]
+    def broken(seat):
+        raise EOFError
+    with pytest.raises(EOFError):
+        g.decide(broken, seat, default=lambda seat: 's')
+
+def test_sleeping_policy_does_not_stall_table():
+    g = newGame(sleepy)
+    rounds = 3
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        g.playRound()
+    elapsed = time.perf_counter() - t0
+
+    # Every decision times out, and takes about the deadline
+    label = g.tableId
+    timeouts = sum(v.value for k, v in metrics.TIMEOUTS.values.items()
+                   if k[0] == label)
+    times = [ v for k, v in metrics.DECISION_SECONDS.values.items()
+              if k[0] == label ]
+    n = sum(sum(h.counts) for h in times)
+    assert timeouts == n > 0
+    # ...rather than the time the policy would take
+    assert elapsed < n * (DEADLINE + SLACK) < n * SLEEP
+
+#==============================================================================
+#==============================================================================
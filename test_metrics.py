@@ -0,0 +1,76 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: test_metrics.py
+#  Created: 10/19/2026, 20:10
+#   Author: Bernie Roesler
+#
+"""
+  Description: Tests of the metrics endpoint: serve the registry on a free
+  local port, play a few rounds, and scrape it like Prometheus would. Run
+  with pytest.
+"""
+#==============================================================================
+import random
+import urllib.error
+import urllib.request
+
+import pytest
+
+# The game needs the names and my_util helpers
+pytest.importorskip("names")
+pytest.importorskip("my_util")
+
+import casinogame
+import metrics
+import strategy
+
+ROUNDS = 5
+
+def scrape(server):
+    host, port = server.server_address[:2]
+    url = "http://{}:{}/metrics".format(host, port)
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        assert resp.status == 200
+        assert resp.headers["Content-Type"].startswith("text/plain")
+        return resp.read().decode("utf-8")
+
+#------------------------------------------------------------------------------
+#       Tests
+#------------------------------------------------------------------------------
+def test_scrape_after_rounds():
+    g = casinogame.Blackjack(rng=random.Random(0))
+    g.botInit(3, 10, money=1e6, policy=strategy.basicStrategy)
+    g.verbose = False
+    for i in range(ROUNDS):
+        g.playRound()
+
+    server = metrics.serve(0)
+    try:
+        body = scrape(server)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    lines = body.splitlines()
+    table = 'table="{}"'.format(g.tableId)
+    assert "# TYPE casino_rounds_total counter" in lines
+    assert "casino_rounds_total{{{}}} {}".format(table, float(ROUNDS)) in lines
+    assert "# TYPE casino_round_seconds histogram" in lines
+    assert 'casino_round_seconds_bucket{{{},le="+Inf"}} {}'.format(
+           table, float(ROUNDS)) in lines
+    assert "casino_round_seconds_count{{{}}} {}".format(
+           table, float(ROUNDS)) in lines
+
+def test_unknown_path():
+    server = metrics.serve(0)
+    try:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen("http://{}:{}/other".format(
+                *server.server_address[:2]), timeout=5)
+        assert e.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+#==============================================================================
+#==============================================================================
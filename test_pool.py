@@ -0,0 +1,76 @@
+#!/usr/local/anaconda3/bin/python
+#==============================================================================
+#     File: test_pool.py
+#  Created: 10/19/2026, 19:30
+#   Author: Bernie Roesler
+#
+"""
+  Description: Tests of the allocation-free round loop: hands are recycled
+  through the HandPool, and a game in steady state allocates nothing per
+  round. Run with pytest.
+"""
+#==============================================================================
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+# The game needs the names and my_util helpers
+pytest.importorskip("names")
+pytest.importorskip("my_util")
+
+import cards
+import casinogame
+import strategy
+
+WARMUP = 2000    # rounds to fill the pools, metric labels and list capacity
+ROUNDS = 10000   # rounds measured
+
+def newGame(seed=0):
+    g = casinogame.Blackjack(rng=random.Random(seed))
+    g.botInit(5, 10, money=1e12, policy=strategy.basicStrategy)
+    g.verbose = False
+    return g
+
+# Net bytes allocated by the game's code over n rounds
+def netAllocated(game, n):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for i in range(n):
+            game.playRound()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    keep = [ tracemalloc.Filter(False, tracemalloc.__file__) ]
+    stats = after.filter_traces(keep).compare_to(before.filter_traces(keep),
+                                                 'filename')
+    return sum(s.size_diff for s in stats)
+
+#------------------------------------------------------------------------------
+#       Tests
+#------------------------------------------------------------------------------
+def test_hands_are_recycled():
+    pool = cards.HandPool()
+    h = pool.acquire(10.0)
+    h.addCard(cards.Card(1, 0))
+    pool.release(h)
+    assert len(pool) == 1
+    h2 = pool.acquire(5.0)
+    assert h2 is h
+    assert h2.cards == [] and h2.bet == 5.0 and h2.score == 0
+
+def test_round_loop_allocates_nothing():
+    g = newGame()
+    for i in range(WARMUP):
+        g.playRound()
+    # A rare deep split or a long hand can still grow a list or the pool of
+    # hands past its old high-water mark. Anything allocated every round
+    # (even a single small object) costs at least 16 bytes per round.
+    assert netAllocated(g, ROUNDS) < ROUNDS
+
+#==============================================================================
+#==============================================================================